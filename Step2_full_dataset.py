@@ -1,7 +1,6 @@
 import os
 import pandas as pd
 from tqdm import tqdm
-import pickle
 
 print("🚀 Full Dataset FAISS Index Builder")
 print("=" * 50)
@@ -10,6 +9,8 @@ print("=" * 50)
 # 1. Load the complete Excel file
 # ---------------------------
 csv_path = "ext_list_Jul_2025.xlsx"
+# 'serving' (default) drops/compresses structures the search app never reads; 'full' keeps them
+index_profile = os.getenv('SCOPUS_INDEX_PROFILE', 'serving')
 print(f"📊 File size: {os.path.getsize(csv_path) / (1024*1024):.1f} MB")
 
 try:
@@ -71,6 +72,9 @@ for idx, (_, row) in enumerate(tqdm(df.iterrows(), desc="Processing rows", total
             'coverage': str(row.get('Coverage', '')),
             'asjc_codes': str(row.get('All Science Journal Classification Codes (ASJC)', '')),
             'language': str(row.get('Article Language in Source (Three-Letter ISO Language Codes)', '')),
+            'added_to_list': str(row.get('Added to List Jul. 2025', '')),
+            'discontinued': str(row.get('Titles Discontinued by Scopus Due to Quality Issues', '')),
+            'medline': str(row.get('Medline-sourced Title? (See additional details under separate tab.)', '')),
             'row_index': idx
         }
         metadatas.append(metadata)
@@ -83,6 +87,27 @@ for idx, (_, row) in enumerate(tqdm(df.iterrows(), desc="Processing rows", total
 
 print(f"✅ Created {len(texts):,} text entries")
 
+# ---------------------------
+# 2b. Precompute static columns
+# ---------------------------
+print("🧾 Precomputing descriptions, coverage ranges and list flags...")
+from journal_metadata import build_columns
+
+columns = build_columns(metadatas)
+print(f"✅ Precomputed {len(columns['descriptions']):,} descriptions")
+
+print("🗂️ Building ASJC subject index...")
+from subject_index import build_subject_index
+
+subject_index = build_subject_index(metadatas, columns['prior_order'])
+print(f"✅ Indexed {len(subject_index['codes']):,} subject codes and major areas")
+
+print("🏷️ Building multi-field BM25F index...")
+from bm25f import build_bm25f_index
+
+bm25f_index = build_bm25f_index(metadatas)
+print(f"✅ BM25F fields: {', '.join(bm25f_index['fields'])} ({len(bm25f_index['idf']):,} terms)")
+
 # ---------------------------
 # 3. Create TF-IDF index
 # ---------------------------
@@ -117,31 +142,52 @@ except Exception as e:
     print(f"❌ Error creating TF-IDF vectors: {e}")
     exit(1)
 
+# ---------------------------
+# 3b. Precompute similar-journal neighbours
+# ---------------------------
+print("🧭 Precomputing similar-journal neighbours...")
+from similar_journals import build_neighbor_table
+
+neighbors = build_neighbor_table(tfidf_matrix, k=20)
+print(f"✅ Stored {neighbors['neighbors'].shape[1]} neighbours for {neighbors['neighbors'].shape[0]:,} journals")
+
 # ---------------------------
 # 4. Save the index
 # ---------------------------
 print("💾 Saving index data...")
 
 try:
+    from datetime import datetime, timezone
+    from index_manifest import SCHEMA_VERSION, save_index
+    from journal_metadata import apply_index_profile
+    
     index_data = {
+        'schema_version': SCHEMA_VERSION,
         'tfidf_matrix': tfidf_matrix,
         'vectorizer': vectorizer,
         'texts': texts,
         'metadatas': metadatas,
+        'columns': columns,
+        'subject_index': subject_index,
+        'bm25f': bm25f_index,
+        'neighbors': neighbors,
         'feature_names': vectorizer.get_feature_names_out(),
         'dataset_info': {
             'total_documents': len(texts),
             'total_features': len(vectorizer.get_feature_names_out()),
             'original_rows': len(df),
-            'source_file': csv_path
+            'source_file': csv_path,
+            'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
         }
     }
+    apply_index_profile(index_data, index_profile)
     
-    with open('scopus_search_index.pkl', 'wb') as f:
-        pickle.dump(index_data, f)
+    # Index and manifest are written to temporary files and replaced together
+    manifest = save_index('scopus_search_index.pkl', index_data, csv_path)
     
     print("✅ Complete index saved to 'scopus_search_index.pkl'")
-    print(f"   File size: {os.path.getsize('scopus_search_index.pkl') / (1024*1024):.1f} MB")
+    print(f"   File size: {os.path.getsize('scopus_search_index.pkl') / (1024*1024):.1f} MB ({index_profile} profile)")
+    print(f"   Manifest: schema v{manifest['schema_version']}, {len(manifest['arrays'])} array checksums")
     
 except Exception as e:
     print(f"❌ Error saving index: {e}")
@@ -207,6 +253,6 @@ for query in test_queries:
 
 print("🎉 Success! Your Scopus search index is ready.")
 print("\nTo use the index in other scripts:")
-print("1. Load with: index_data = pickle.load(open('scopus_search_index.pkl', 'rb'))")
+print("1. Load with: from index_manifest import load_index; index_data, manifest = load_index('scopus_search_index.pkl')")
 print("2. Use the search_scopus function above as a template")
 print("3. Access metadata for detailed information about each journal")
@@ -1,62 +1,58 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, abort
 import os
 import json
-import re
+import mimetypes
+import time
 from search_scopus import ScopusSearchEngine
+from subject_index import parse_subject_query
+from query_log import QueryLogger
+from build_static import ensure_built, load_assets, compress_variants, fingerprint
 
-app = Flask(__name__)
+# Static files are served from the pre-compressed build (see build_static.py)
+app = Flask(__name__, static_folder=None)
 
-def generate_journal_description(result):
-    """Generate a 2-line NLP description for a journal based on its metadata."""
-    try:
-        title = result.get('title', 'Unknown Journal')
-        publisher = result.get('publisher', 'Unknown Publisher')
-        journal_type = result.get('type', 'Journal')
-        open_access = result.get('open_access', '')
-        coverage = result.get('coverage', '')
-        active_status = result.get('active_status', '')
-        
-        # Extract coverage years if available
-        coverage_years = ''
-        if coverage and coverage != 'nan':
-            # Extract years from coverage string
-            years = re.findall(r'\d{4}', str(coverage))
-            if years:
-                if len(years) >= 2:
-                    coverage_years = f"from {years[0]} to {years[-1]}"
-                else:
-                    coverage_years = f"since {years[0]}"
-        
-        # Generate first line
-        if journal_type.lower() == 'journal':
-            line1 = f"{title} is a scholarly journal published by {publisher}."
-        else:
-            line1 = f"{title} is a {journal_type.lower()} published by {publisher}."
-        
-        # Generate second line with additional info
-        info_parts = []
-        
-        if active_status and active_status.lower() == 'active':
-            info_parts.append("currently active")
-        elif active_status and active_status.lower() == 'inactive':
-            info_parts.append("no longer active")
-            
-        if coverage_years:
-            info_parts.append(f"with coverage {coverage_years}")
-            
-        if open_access and open_access.lower() in ['full', 'hybrid']:
-            access_type = "full open access" if open_access.lower() == 'full' else "hybrid open access"
-            info_parts.append(f"offering {access_type}")
-        
-        if info_parts:
-            line2 = f"This publication is {', '.join(info_parts)}."
-        else:
-            line2 = "This publication provides academic content in its field of study."
-        
-        return f"{line1} {line2}"
-        
-    except Exception as e:
-        return f"This is {result.get('title', 'a journal')} published by {result.get('publisher', 'an academic publisher')}. It provides scholarly content for researchers and academics in its field."
+# Fingerprinted assets never change; pages and favicon metadata revalidate
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+METADATA_CACHE = 'public, max-age=86400'
+SHORT_CACHE_SECONDS = 300
+
+def parse_year(value):
+    """Parse an optional year filter value, returning None when it is blank."""
+    if value is None or str(value).strip() == '':
+        return None
+    return int(value)
+
+def parse_flag(value):
+    """Parse an optional boolean filter value ('true', '1', 'yes', 'on' or a JSON boolean)."""
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off', ''):
+        return False
+    raise ValueError(f"invalid flag value {value!r}")
+
+def format_result(result, rank):
+    """Format an engine result for the JSON API."""
+    return {
+        'rank': rank,
+        'title': result['title'],
+        'publisher': result['publisher'],
+        'type': result['type'],
+        'issn': result['issn'] if result['issn'] != 'nan' else '',
+        'eissn': result['eissn'] if result['eissn'] != 'nan' else '',
+        'open_access': result['open_access'] if result['open_access'] != 'nan' else '',
+        'active_status': result.get('active_status', ''),
+        'coverage': result['coverage'] if result['coverage'] != 'nan' else '',
+        'coverage_start': result['coverage_start'] or None,
+        'coverage_end': result['coverage_end'] or None,
+        'language': result['language'] if result['language'] != 'nan' else '',
+        'subject_areas': result['subject_areas'] if result['subject_areas'] != 'nan' else '',
+        'sourcerecord_id': result['sourcerecord_id'],
+        'description': result['description']
+    }
 
 # Initialize the search engine
 print("🚀 Initializing Scopus Search Engine...")
@@ -67,10 +63,90 @@ except Exception as e:
     print(f"❌ Error initializing search engine: {e}")
     search_engine = None
 
+# Minify, fingerprint and pre-compress the static assets if their sources changed
+asset_manifest = ensure_built()
+static_assets = load_assets(asset_manifest)
+rendered_pages = {}
+
+@app.context_processor
+def asset_helpers():
+    """Expose asset_url('app.css') -> fingerprinted URL to templates."""
+    return {'asset_url': lambda name: f"/static/{asset_manifest[name]}"}
+
+def rendered_template(name):
+    """Render a template once and keep its compressed variants and ETag."""
+    if name not in rendered_pages or app.debug:
+        body = render_template(name).encode('utf-8')
+        rendered_pages[name] = (compress_variants(body), fingerprint(body))
+    return rendered_pages[name]
+
+def precompressed_response(variants, etag, mimetype, cache_control):
+    """Serve the best pre-compressed variant the client accepts, answering If-None-Match with 304."""
+    encoding = next((name for name in ('br', 'gzip') if name in variants and request.accept_encodings[name]),
+                    'identity')
+    response = app.response_class(variants[encoding], mimetype=mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{etag}-{encoding}")
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+def short_cached(response):
+    """Mark a JSON response as cacheable for a few minutes, with an ETag."""
+    response.cache_control.public = True
+    response.cache_control.max_age = SHORT_CACHE_SECONDS
+    response.add_etag()
+    return response.make_conditional(request)
+
+# Optional sampled query log for capacity planning (see replay_queries.py)
+query_logger = None
+if os.getenv('SCOPUS_QUERY_LOG'):
+    query_logger = QueryLogger(os.getenv('SCOPUS_QUERY_LOG'),
+                               sample_rate=float(os.getenv('SCOPUS_QUERY_LOG_SAMPLE', '1.0')))
+
+def log_search(data, engine_args, status, n_results, started):
+    """Record one /search request in the query log, if enabled."""
+    if not query_logger:
+        return
+    # Called from error handlers too, so tolerate any JSON body shape
+    body = data if isinstance(data, dict) else {}
+    filters = body.get('filters') if isinstance(body.get('filters'), dict) else {}
+    query = str(body.get('query', ''))
+    query_logger.log({
+        'request': data,
+        'engine_args': engine_args,
+        'query_type': 'issn' if ScopusSearchEngine.is_issn_query(query) else 'text',
+        'filters_used': sorted(key for key, value in filters.items() if value),
+        'status': status,
+        'results': n_results,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
 @app.route('/')
 def index():
     """Main page with search interface."""
-    return render_template('index.html')
+    return precompressed_response(*rendered_template('index.html'), 'text/html', REVALIDATE_CACHE)
+
+@app.route('/static/<path:filename>')
+def static_asset(filename):
+    """Serve a fingerprinted, pre-compressed asset from static/dist."""
+    variants = static_assets.get(filename)
+    if variants is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    return precompressed_response(variants, filename, mimetype, IMMUTABLE_CACHE)
+
+@app.route('/site.webmanifest')
+def site_webmanifest():
+    """Web app manifest referenced by the favicon links."""
+    return precompressed_response(*rendered_template('favicon_manifest.json'), 'application/manifest+json',
+                                  METADATA_CACHE)
+
+@app.route('/browserconfig.xml')
+def browserconfig():
+    """Tile configuration for Windows pinned sites."""
+    return precompressed_response(*rendered_template('browserconfig_xml.txt'), 'application/xml', METADATA_CACHE)
 
 @app.route('/search', methods=['POST'])
 def search():
@@ -81,29 +157,56 @@ def search():
             'results': []
         }), 500
     
+    started = time.perf_counter()
+    data = None
+    engine_args = None
     try:
-        data = request.get_json()
-        query = data.get('query', '').strip()
-        top_k = int(data.get('top_k', 20))
-        min_score = float(data.get('min_score', 0.1))
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            log_search(data, engine_args, 400, 0, started)
+            return jsonify({'error': 'Request body must be a JSON object', 'results': []}), 400
         
-        # Advanced filters
-        filters = data.get('filters', {})
-        publisher_filter = filters.get('publisher', '').strip().lower()
-        type_filter = filters.get('type', '').strip()
-        open_access_filter = filters.get('open_access', '').strip()
-        subject_filter = filters.get('subject_areas', '').strip()
-        language_filter = filters.get('language', '').strip()
+        # Malformed numbers, years or subject codes are client errors
+        try:
+            query = data.get('query', '').strip()
+            top_k = int(data.get('top_k', 20))
+            min_score = float(data.get('min_score', 0.1))
+            field_weights = {field: float(weight) for field, weight in (data.get('field_weights') or {}).items()}
+            
+            # Advanced filters
+            filters = data.get('filters', {})
+            publisher_filter = filters.get('publisher', '').strip().lower()
+            type_filter = filters.get('type', '').strip()
+            open_access_filter = filters.get('open_access', '').strip()
+            subject_filter = filters.get('subject_areas', '').strip()
+            language_filter = filters.get('language', '').strip()
+            
+            # Coverage/list/subject filters are evaluated inside the engine as row masks
+            range_filters = {
+                'start_year_max': parse_year(filters.get('start_year_max')),
+                'end_year_min': parse_year(filters.get('end_year_min')),
+                'covered_year': parse_year(filters.get('covered_year')),
+                'added_only': parse_flag(filters.get('added_to_list')),
+                'subjects': parse_subject_query(subject_filter),
+                'subject_mode': 'and' if filters.get('subject_mode') == 'and' else 'or',
+                'exclude_discontinued': parse_flag(filters.get('exclude_discontinued')),
+            }
+        except (ValueError, TypeError, AttributeError, OverflowError) as e:
+            log_search(data, engine_args, 400, 0, started)
+            return jsonify({'error': f'Invalid search parameters: {e}', 'results': []}), 400
         
         if not query:
+            log_search(data, engine_args, 400, 0, started)
             return jsonify({
                 'error': 'Please enter a search query',
                 'results': []
             }), 400
         
         # Perform search with higher top_k to allow for filtering
-        search_limit = max(top_k * 3, 100) if any([publisher_filter, type_filter, open_access_filter, subject_filter, language_filter]) else top_k
-        results = search_engine.search(query, top_k=search_limit, min_score=min_score)
+        search_limit = max(top_k * 3, 100) if any([publisher_filter, type_filter, open_access_filter, language_filter]) else top_k
+        engine_args = dict(query=query, top_k=search_limit, min_score=min_score,
+                           field_weights=field_weights or None, **range_filters)
+        results = search_engine.search(**engine_args)
         
         # Apply advanced filters
         filtered_results = []
@@ -120,13 +223,6 @@ def search():
             if open_access_filter and open_access_filter not in result['open_access']:
                 continue
                 
-            # Subject areas filter
-            if subject_filter:
-                subject_codes = [code.strip() for code in subject_filter.split(',')]
-                result_subjects = result['subject_areas'].split(';') if result['subject_areas'] != 'nan' else []
-                if not any(code in result_subjects for code in subject_codes):
-                    continue
-                    
             # Language filter
             if language_filter and language_filter != result['language']:
                 continue
@@ -138,23 +234,8 @@ def search():
                 break
         
         # Format results for JSON response
-        formatted_results = []
-        for i, result in enumerate(filtered_results):
-            formatted_result = {
-                'rank': i + 1,
-                'title': result['title'],
-                'publisher': result['publisher'],
-                'type': result['type'],
-                'issn': result['issn'] if result['issn'] != 'nan' else '',
-                'eissn': result['eissn'] if result['eissn'] != 'nan' else '',
-                'open_access': result['open_access'] if result['open_access'] != 'nan' else '',
-                'active_status': result.get('active_status', ''),
-                'coverage': result['coverage'] if result['coverage'] != 'nan' else '',
-                'language': result['language'] if result['language'] != 'nan' else '',
-                'sourcerecord_id': result['sourcerecord_id'],
-                'description': generate_journal_description(result)
-            }
-            formatted_results.append(formatted_result)
+        formatted_results = [format_result(result, i + 1) for i, result in enumerate(filtered_results)]
+        log_search(data, engine_args, 200, len(formatted_results), started)
         
         return jsonify({
             'query': query,
@@ -164,11 +245,67 @@ def search():
         })
         
     except Exception as e:
+        log_search(data, engine_args, 500, 0, started)
         return jsonify({
             'error': f'Search error: {str(e)}',
             'results': []
         }), 500
 
+@app.route('/subjects/<codes>')
+def browse_subjects(codes):
+    """Browse journals in one or more ASJC subjects, ranked by static prior.
+    
+    Codes are comma- or plus-separated 4-digit ASJC codes or 2-digit major
+    areas; ?mode=and requires every subject, the default matches any.
+    """
+    if not search_engine:
+        return jsonify({'error': 'Search engine not available', 'results': []}), 500
+    
+    try:
+        subjects = parse_subject_query(codes)
+        mode = 'and' if request.args.get('mode') == 'and' else 'or'
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), 100)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'results': []}), 400
+    
+    if not subjects:
+        return jsonify({'error': 'Please enter at least one ASJC code', 'results': []}), 400
+    
+    offset = (page - 1) * per_page
+    total, results = search_engine.browse_subjects(subjects, mode=mode, offset=offset, limit=per_page)
+    return jsonify({
+        'subjects': subjects,
+        'mode': mode,
+        'page': page,
+        'per_page': per_page,
+        'total_results': total,
+        'results': [format_result(result, offset + i + 1) for i, result in enumerate(results)]
+    })
+
+@app.route('/journal/<sourcerecord_id>/similar')
+def similar_journals(sourcerecord_id):
+    """Get journals similar to the given journal."""
+    if not search_engine:
+        return jsonify({'error': 'Search engine not available', 'results': []}), 500
+    
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'k must be an integer', 'results': []}), 400
+    active_only = request.args.get('active_only', '').lower() in ('1', 'true', 'yes')
+    
+    try:
+        results = search_engine.similar(sourcerecord_id, k=k, active_only=active_only)
+    except KeyError:
+        return jsonify({'error': f'Journal {sourcerecord_id} not found', 'results': []}), 404
+    
+    return jsonify({
+        'sourcerecord_id': sourcerecord_id,
+        'total_results': len(results),
+        'results': [format_result(result, i + 1) for i, result in enumerate(results)]
+    })
+
 @app.route('/stats')
 def stats():
     """Get dataset statistics."""
@@ -177,19 +314,22 @@ def stats():
     
     try:
         info = search_engine.index_data['dataset_info']
-        return jsonify({
+        return short_cached(jsonify({
             'total_journals': info['total_documents'],
             'total_features': info['total_features'],
             'source_file': info['source_file'],
-            'index_size_mb': round(os.path.getsize('scopus_search_index.pkl') / (1024*1024), 1)
-        })
+            'index_size_mb': round(os.path.getsize('scopus_search_index.pkl') / (1024*1024), 1),
+            'schema_version': search_engine.index_data.get('schema_version', 1),
+            'built_at': info.get('built_at'),
+            'verified': search_engine.manifest is not None
+        }))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/suggestions')
 def suggestions():
     """Get search suggestions."""
-    return jsonify({
+    return short_cached(jsonify({
         'suggestions': [
             "computer science artificial intelligence",
             "medical health journal",
@@ -207,7 +347,7 @@ def suggestions():
             "education learning teaching",
             "renewable energy sustainability"
         ]
-    })
+    }))
 
 if __name__ == '__main__':
     print("\n🌐 Starting Scopus Search Web Interface...")
@@ -0,0 +1,156 @@
+"""
+Multi-field BM25F index and scorer.
+
+Each metadata field (title, publisher, subjects, ...) gets its own sparse
+term-frequency matrix over a shared vocabulary, so a title hit can weigh more
+than a publisher hit and numeric ASJC codes or boilerplate such as
+"Journal" / "Open Access" no longer dilute the title terms.
+
+Scoring a query slices the query-term columns out of each field matrix
+(stored CSC, so this is cheap), length-normalises and weights them, sums the
+fields and applies the BM25 saturation once per (journal, term) pair.
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from journal_metadata import clean_value
+
+# Metadata key feeding each field
+FIELD_SOURCES = {
+    'title': 'source_title',
+    'publisher': 'publisher',
+    'subjects': 'asjc_codes',
+    'type': 'source_type',
+    'open_access': 'open_access',
+    'language': 'language',
+}
+
+# Query-time boosts per field
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'publisher': 1.0,
+    'subjects': 0.5,
+    'type': 0.3,
+    'open_access': 0.3,
+    'language': 0.2,
+}
+
+# Length normalisation per field (0 = none, 1 = full)
+DEFAULT_FIELD_B = {
+    'title': 0.75,
+    'publisher': 0.5,
+    'subjects': 0.3,
+    'type': 0.0,
+    'open_access': 0.0,
+    'language': 0.0,
+}
+
+DEFAULT_K1 = 1.2
+
+
+def field_texts(metadatas):
+    """Return {field: list of per-journal strings} for the BM25F fields."""
+    return {
+        field: [clean_value(metadata.get(key)) for metadata in metadatas]
+        for field, key in FIELD_SOURCES.items()
+    }
+
+
+def build_bm25f_index(metadatas):
+    """
+    Build the per-field term-frequency matrices.
+
+    Returns:
+        dict: 'vectorizer' (CountVectorizer), 'idf' (float32 per term) and
+        'fields' mapping each field to its CSC 'tf' matrix and
+        'length_ratio' (field length / average field length)
+    """
+    texts = field_texts(metadatas)
+    vectorizer = CountVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2),
+        lowercase=True,
+        strip_accents='unicode',
+        dtype=np.float32
+    )
+    vectorizer.fit(value for values in texts.values() for value in values)
+
+    fields = {}
+    in_doc = None
+    for field, values in texts.items():
+        tf = vectorizer.transform(values).tocsr()
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        average = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        fields[field] = {
+            'tf': tf.tocsc(),
+            'length_ratio': (lengths / average).astype(np.float32),
+        }
+        present = tf.copy()
+        present.data[:] = 1
+        in_doc = present if in_doc is None else in_doc.maximum(present)
+
+    doc_freq = np.bincount(in_doc.indices, minlength=len(vectorizer.vocabulary_))
+    n_docs = len(metadatas)
+    idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    return {
+        'vectorizer': vectorizer,
+        'idf': idf,
+        'fields': fields,
+    }
+
+
+class BM25FScorer:
+    """Vectorised BM25F scoring over an index from build_bm25f_index()."""
+
+    def __init__(self, index, field_weights=None, field_b=None, k1=DEFAULT_K1):
+        self.vectorizer = index['vectorizer']
+        self.idf = index['idf']
+        self.fields = index['fields']
+        self.field_weights = dict(DEFAULT_FIELD_WEIGHTS, **(field_weights or {}))
+        self.field_b = dict(DEFAULT_FIELD_B, **(field_b or {}))
+        self.k1 = k1
+        self.n_docs = next(iter(self.fields.values()))['tf'].shape[0] if self.fields else 0
+
+    def score(self, query, field_weights=None):
+        """
+        Score every journal against the query.
+
+        Scores are divided by the summed idf of the query terms, so they
+        fall in [0, 1) like the cosine scores of the TF-IDF path.
+
+        Args:
+            query (str): Free-text query
+            field_weights (dict): Per-query overrides of the field boosts
+
+        Returns:
+            numpy.ndarray: float32 score per journal
+        """
+        weights = dict(self.field_weights, **(field_weights or {}))
+        terms = np.unique(self.vectorizer.transform([query]).indices)
+        if not len(terms):
+            return np.zeros(self.n_docs, dtype=np.float32)
+
+        combined = None
+        for field, data in self.fields.items():
+            weight = weights.get(field, 0.0)
+            if weight <= 0:
+                continue
+            tf = data['tf'][:, terms]
+            b = self.field_b.get(field, 0.0)
+            if b:
+                norm = 1.0 - b + b * data['length_ratio'][tf.indices]
+                tf = sparse.csc_matrix((tf.data * (weight / norm), tf.indices, tf.indptr), shape=tf.shape)
+            else:
+                tf = tf * weight
+            combined = tf if combined is None else combined + tf
+
+        if combined is None:
+            return np.zeros(self.n_docs, dtype=np.float32)
+
+        combined = combined.tocsr()
+        combined.data = combined.data / (combined.data + self.k1)
+        idf = self.idf[terms]
+        return (combined @ idf).astype(np.float32) / idf.sum()
@@ -0,0 +1,203 @@
+"""
+Static asset pipeline for the web interface.
+
+The stylesheet and script of templates/index.html live in static/src. This
+script minifies them, writes them to static/dist under content-hashed names
+(app.3f2a9c1e5b7d.css) and pre-compresses every file to .gz and, when the
+optional brotli package is installed, .br. static/dist/manifest.json maps
+source names to built names; app.py resolves {{ asset_url('app.css') }}
+through it and serves the files with immutable caching.
+
+    python build_static.py            # build when sources changed
+    python build_static.py --force    # always rebuild
+
+app.py calls ensure_built() at startup, so running this by hand is only
+needed to prepare assets for a CDN or reverse proxy.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(BASE_DIR, 'static', 'src')
+DIST_DIR = os.path.join(BASE_DIR, 'static', 'dist')
+MANIFEST_FILE = os.path.join(DIST_DIR, 'manifest.json')
+
+# Source files to build, relative to SOURCE_DIR
+ASSETS = ('app.css', 'app.js')
+
+# Content-Encoding -> file suffix of the pre-compressed variants
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+_CSS_STRING_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION_PATTERN = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(source):
+    """Minify a stylesheet (rcssmin when installed, else a string-aware fallback)."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+
+    parts = _CSS_STRING_PATTERN.split(source)
+    for i in range(0, len(parts), 2):  # odd parts are quoted strings
+        code = _CSS_COMMENT_PATTERN.sub('', parts[i])
+        code = ' '.join(code.split())
+        code = _CSS_PUNCTUATION_PATTERN.sub(r'\1', code)
+        parts[i] = code.replace(': ', ':').replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_js(source):
+    """
+    Minify a script (rjsmin when installed).
+
+    The fallback only removes indentation, blank lines and whole-line
+    comments, which is safe without a JavaScript tokenizer.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def compress_variants(data):
+    """
+    Pre-compress content for every supported Content-Encoding.
+
+    Returns:
+        dict: Content-Encoding ('identity', 'gzip', 'br') -> bytes
+    """
+    variants = {'identity': data, 'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def fingerprint(data):
+    """Return a short content hash used in built file names and ETags."""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def is_stale():
+    """Check whether static/dist is missing or older than its sources."""
+    if not os.path.exists(MANIFEST_FILE):
+        return True
+    built_at = os.path.getmtime(MANIFEST_FILE)
+    sources = [os.path.join(SOURCE_DIR, name) for name in ASSETS] + [os.path.abspath(__file__)]
+    return any(os.path.getmtime(path) > built_at for path in sources)
+
+
+def _write_atomic(path, content):
+    """
+    Write a file under a temporary name and rename it into place.
+
+    Several app workers may build at startup; readers only ever see complete
+    files, and each writer uses its own temporary name.
+    """
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_file, path)
+
+
+def build(verbose=True):
+    """
+    Minify, fingerprint and pre-compress every asset into static/dist.
+
+    Returns:
+        dict: Source name -> built (fingerprinted) file name
+    """
+    os.makedirs(DIST_DIR, exist_ok=True)
+    minifiers = {'.css': minify_css, '.js': minify_js}
+    manifest = {}
+
+    for name in ASSETS:
+        with open(os.path.join(SOURCE_DIR, name), 'r', encoding='utf-8') as f:
+            source = f.read()
+        stem, ext = os.path.splitext(name)
+        data = minifiers[ext](source).encode('utf-8')
+        built_name = f"{stem}.{fingerprint(data)}{ext}"
+
+        for encoding, content in compress_variants(data).items():
+            _write_atomic(os.path.join(DIST_DIR, built_name + ENCODING_SUFFIXES.get(encoding, '')), content)
+        manifest[name] = built_name
+
+        if verbose:
+            print(f"📦 {name}: {len(source):,} -> {len(data):,} bytes minified -> {built_name}")
+
+    _write_atomic(MANIFEST_FILE, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    # Drop files of earlier builds (another process building at the same time may get there first)
+    current = {built + suffix for built in manifest.values() for suffix in ('', *ENCODING_SUFFIXES.values())}
+    for filename in os.listdir(DIST_DIR):
+        if filename != os.path.basename(MANIFEST_FILE) and filename not in current and '.tmp' not in filename:
+            try:
+                os.remove(os.path.join(DIST_DIR, filename))
+            except FileNotFoundError:
+                pass
+    return manifest
+
+
+def ensure_built():
+    """Build the assets if needed and return the manifest."""
+    if is_stale():
+        return build(verbose=False)
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_assets(manifest):
+    """
+    Read the built assets and their pre-compressed variants into memory.
+
+    Returns:
+        dict: Built file name -> {Content-Encoding: bytes}
+    """
+    assets = {}
+    for built_name in manifest.values():
+        variants = {}
+        for encoding, suffix in (('identity', ''), *ENCODING_SUFFIXES.items()):
+            path = os.path.join(DIST_DIR, built_name + suffix)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    variants[encoding] = f.read()
+        assets[built_name] = variants
+    return assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify, fingerprint and pre-compress the web assets.")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+
+    if not args.force and not is_stale():
+        print("✅ Static assets are up to date")
+        return
+    manifest = build()
+    print(f"✅ Built {len(manifest)} assets into {DIST_DIR}"
+          + ("" if brotli else " (install brotli for .br variants)"))
+
+
+if __name__ == "__main__":
+    main()
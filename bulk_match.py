@@ -0,0 +1,235 @@
+"""
+Bulk journal matching for reference lists and manuscripts.
+
+Streams a CSV or BibTeX file of journal names and/or ISSNs, resolves each
+record to a Scopus sourcerecord_id with ScopusSearchEngine.match (ISSN first,
+then exact title, then best text-search hit) and writes results to CSV or
+JSON lines as it goes. Chunks of records are matched in a forked process
+pool: the index is loaded once in the parent and the workers share its
+NumPy/SciPy buffers copy-on-write instead of each loading a copy. Output is
+written in input order, so an interrupted run can be resumed from the last
+complete line.
+
+    python search_scopus.py --bulk references.bib --output matches.csv
+    python search_scopus.py --bulk journals.csv --output matches.jsonl --workers 8 --resume
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+
+OUTPUT_FIELDS = [
+    'record', 'input_name', 'input_issn', 'match_type', 'score',
+    'sourcerecord_id', 'title', 'issn', 'eissn', 'publisher',
+]
+
+# Input CSV column names recognised as the journal name / ISSN, compared after
+# lowercasing and treating underscores as spaces. Name columns are tried in
+# this order; the generic ones only when no journal-specific column exists.
+NAME_COLUMNS = ('journal', 'journal name', 'journal title', 'source title')
+GENERIC_NAME_COLUMNS = ('title', 'name')
+ISSN_COLUMNS = ('issn', 'eissn', 'e-issn', 'issn l', 'issn-l')
+
+_BIBTEX_FIELD_PATTERN = re.compile(
+    r'\b(journal|journaltitle|issn)\s*=\s*(?:\{((?:[^{}]|\{[^{}]*\})*)\}|"([^"]*)")',
+    re.IGNORECASE
+)
+
+# Engine shared with forked worker processes
+_engine = None
+_min_score = 0.5
+
+
+def normalize_column(column):
+    """Normalise a CSV header for matching ('Journal_Name ' -> 'journal name')."""
+    return ' '.join(column.replace('_', ' ').split()).lower()
+
+
+def read_csv_records(path):
+    """Yield (name, issn) tuples from a CSV file, one per data row."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [normalize_column(column) for column in header]
+        name_cols = ([columns.index(name) for name in NAME_COLUMNS if name in columns]
+                     or [columns.index(name) for name in GENERIC_NAME_COLUMNS if name in columns])
+        issn_cols = [i for i, column in enumerate(columns) if column in ISSN_COLUMNS]
+        if not name_cols and not issn_cols:
+            # Header-less single-column list of names
+            name_cols = [0]
+            yield header[0], ''
+
+        for row in reader:
+            name = next((row[i] for i in name_cols if i < len(row) and row[i].strip()), '')
+            issn = ';'.join(row[i] for i in issn_cols if i < len(row) and row[i].strip())
+            yield name, issn
+
+
+def read_bibtex_records(path):
+    """Yield (name, issn) tuples from the entries of a BibTeX file."""
+    def parse(entry):
+        fields = {}
+        for key, braced, quoted in _BIBTEX_FIELD_PATTERN.findall(entry):
+            fields.setdefault(key.lower(), ' '.join((braced or quoted).replace('{', '').replace('}', '').split()))
+        return fields.get('journal') or fields.get('journaltitle', ''), fields.get('issn', '')
+
+    entry = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            if line.lstrip().startswith('@') and entry:
+                yield parse(''.join(entry))
+                entry = []
+            if line.lstrip().startswith('@') or entry:
+                entry.append(line)
+    if entry:
+        yield parse(''.join(entry))
+
+
+def read_records(path):
+    """Yield (record number, name, issn) for every input record, skipping empty ones."""
+    reader = read_bibtex_records if path.lower().endswith(('.bib', '.bibtex')) else read_csv_records
+    for number, (name, issn) in enumerate(reader(path), 1):
+        if name.strip() or issn.strip():
+            yield number, name.strip(), issn.strip()
+
+
+def _init_worker(engine, min_score):
+    global _engine, _min_score
+    _engine = engine
+    _min_score = min_score
+
+
+def _match_chunk(chunk):
+    """Match a chunk of (record, name, issn) tuples; runs in a worker."""
+    rows = []
+    for number, name, issn in chunk:
+        match_type, result = _engine.match(name=name, issn=issn, min_score=_min_score)
+        row = {'record': number, 'input_name': name, 'input_issn': issn, 'match_type': match_type or 'none'}
+        if result:
+            row.update({
+                'score': round(float(result['score']), 4),
+                'sourcerecord_id': result['sourcerecord_id'],
+                'title': result['title'],
+                'issn': result['issn'] if result['issn'] != 'nan' else '',
+                'eissn': result['eissn'] if result['eissn'] != 'nan' else '',
+                'publisher': result['publisher'],
+            })
+        rows.append(row)
+    return rows
+
+
+def _chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _resume_point(output_path, output_format):
+    """
+    Drop a torn trailing line from an interrupted run.
+
+    Returns:
+        int: Last record number already written (0 when starting fresh)
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return 0
+
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        f.truncate(end)
+        lines = data[:end].decode('utf-8').splitlines()
+
+    if output_format == 'jsonl':
+        return json.loads(lines[-1])['record'] if lines else 0
+    rows = list(csv.DictReader(lines[-1:], fieldnames=OUTPUT_FIELDS)) if len(lines) > 1 else []
+    return int(rows[0]['record']) if rows else 0
+
+
+def run_bulk_match(engine, input_path, output_path, workers=None, chunk_size=500,
+                   min_score=0.5, resume=False, output_format=None):
+    """
+    Match every record of input_path and write the results to output_path.
+
+    Args:
+        engine (ScopusSearchEngine): Loaded search engine
+        input_path (str): CSV or BibTeX (.bib) file of journal names/ISSNs
+        output_path (str): Destination file (.csv or .jsonl)
+        workers (int): Worker processes (defaults to the CPU count)
+        chunk_size (int): Records per task sent to a worker
+        min_score (float): Minimum score for a text-search match
+        resume (bool): Continue after the last record of an existing output file
+        output_format (str): 'csv' or 'jsonl' (defaults to the output extension)
+
+    Returns:
+        dict: Counts of processed records per match type
+    """
+    output_format = output_format or ('jsonl' if output_path.lower().endswith(('.jsonl', '.json')) else 'csv')
+    workers = workers or os.cpu_count() or 1
+
+    done = _resume_point(output_path, output_format) if resume else 0
+    records = (record for record in read_records(input_path) if record[0] > done)
+    if done:
+        print(f"↩️ Resuming after record {done:,}", file=sys.stderr)
+
+    counts = {}
+    started = time.perf_counter()
+    last_report = started
+    write_header = output_format == 'csv' and (not resume or not os.path.exists(output_path)
+                                               or os.path.getsize(output_path) == 0)
+
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8', newline='') as out:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS) if output_format == 'csv' else None
+        if write_header:
+            writer.writeheader()
+
+        def write(rows):
+            nonlocal last_report
+            for row in rows:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(row, ensure_ascii=False) + '\n')
+                counts[row['match_type']] = counts.get(row['match_type'], 0) + 1
+            out.flush()
+
+            now = time.perf_counter()
+            if now - last_report >= 2:
+                last_report = now
+                total = sum(counts.values())
+                print(f"⏱️ {total:,} records ({total / (now - started):,.0f}/s), "
+                      f"{total - counts.get('none', 0):,} matched", file=sys.stderr)
+
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers, initializer=_init_worker, initargs=(engine, min_score)) as pool:
+                # Keep a bounded window of chunks in flight so the input is streamed
+                pending = deque()
+                for chunk in _chunks(records, chunk_size):
+                    pending.append(pool.apply_async(_match_chunk, (chunk,)))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().get())
+                while pending:
+                    write(pending.popleft().get())
+        else:
+            _init_worker(engine, min_score)
+            for chunk in _chunks(records, chunk_size):
+                write(_match_chunk(chunk))
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"✅ Matched {total - counts.get('none', 0):,} of {total:,} records in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:,.0f}/s) -> {output_path}", file=sys.stderr)
+    return counts
@@ -1,14 +1,38 @@
 import os
+import pickle
 import gdown
+from index_manifest import IndexIntegrityError, load_index, manifest_path
 
-# Read file ID from environment variable
+# Read file IDs from environment variables
 file_id = os.getenv("DRIVE_FILE_ID")
 if not file_id:
     raise ValueError("DRIVE_FILE_ID environment variable not set.")
+manifest_id = os.getenv("DRIVE_MANIFEST_ID")
 
 url = f"https://drive.google.com/uc?id={file_id}"
 output = "scopus_search_index.pkl"
+tmp_output = output + ".download"
 
 print(f"Downloading from {url}...")
-gdown.download(url, output, quiet=False)
+gdown.download(url, tmp_output, quiet=False)
+
+if manifest_id:
+    print("Downloading manifest...")
+    gdown.download(f"https://drive.google.com/uc?id={manifest_id}", manifest_path(tmp_output), quiet=False)
+else:
+    print("DRIVE_MANIFEST_ID not set; the index cannot be verified.")
+
+# Verify before replacing the served index, so a truncated download is never used
+try:
+    load_index(tmp_output, require_manifest=bool(manifest_id))
+except (IndexIntegrityError, pickle.UnpicklingError, EOFError, ValueError) as e:
+    os.remove(tmp_output)
+    raise SystemExit(f"Downloaded index rejected: {e}")
+
+if manifest_id:
+    os.replace(manifest_path(tmp_output), manifest_path(output))
+elif os.path.exists(manifest_path(output)):
+    # The previous index's manifest would reject the new file on load
+    os.remove(manifest_path(output))
+os.replace(tmp_output, output)
 print("Download complete.")
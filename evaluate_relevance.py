@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Offline relevance evaluation for the Scopus search engine.
+
+Runs a set of judged queries through each scoring method and reports MRR,
+nDCG and recall at a cutoff, plus mean latency. Judgments are JSON lines:
+
+    {"query": "machine learning", "relevant": ["21100215163", "..."]}
+
+Without a judgments file, a known-item set is sampled instead: each query is
+a journal title and the only relevant result is that journal.
+
+    python evaluate_relevance.py --judgments judgments.jsonl --k 10
+    python evaluate_relevance.py --known-item 500 --weights '{"title": 5}'
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from search_scopus import ScopusSearchEngine
+
+
+def load_judgments(path):
+    """Load judged queries from a JSON lines file."""
+    judgments = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line)
+                judgments.append((item['query'], set(str(r) for r in item['relevant'])))
+    return judgments
+
+
+def known_item_judgments(engine, count, seed=42):
+    """Sample journal titles as queries whose only relevant result is the journal itself."""
+    rng = random.Random(seed)
+    candidates = [m for m in engine.metadatas if m.get('source_title') not in (None, '', 'nan')]
+    sample = rng.sample(candidates, min(count, len(candidates)))
+    return [(m['source_title'], {m['sourcerecord_id']}) for m in sample]
+
+
+def evaluate(engine, judgments, k=10, field_weights=None):
+    """
+    Run every judged query and compute the averaged metrics.
+
+    Returns:
+        dict: mrr, ndcg, recall (all at k) and mean latency in ms
+    """
+    totals = {'mrr': 0.0, 'ndcg': 0.0, 'recall': 0.0, 'latency_ms': 0.0}
+    for query, relevant in judgments:
+        start = time.perf_counter()
+        results = engine.search(query, top_k=k, min_score=0.0, field_weights=field_weights)
+        totals['latency_ms'] += (time.perf_counter() - start) * 1000
+
+        ranked = [result['sourcerecord_id'] for result in results]
+        hits = [i for i, record_id in enumerate(ranked) if record_id in relevant]
+        if hits:
+            totals['mrr'] += 1.0 / (hits[0] + 1)
+        dcg = sum(1.0 / math.log2(i + 2) for i in hits)
+        ideal = sum(1.0 / math.log2(i + 2) for i in range(min(len(relevant), k)))
+        totals['ndcg'] += dcg / ideal if ideal else 0.0
+        totals['recall'] += len(hits) / len(relevant) if relevant else 0.0
+
+    return {name: value / max(len(judgments), 1) for name, value in totals.items()}
+
+
+def main():
+    """Compare scoring methods on a judged query set."""
+    parser = argparse.ArgumentParser(description="Offline relevance evaluation for Scopus search.")
+    parser.add_argument('--index', default='scopus_search_index.pkl')
+    parser.add_argument('--judgments', help="JSON lines file of {query, relevant}")
+    parser.add_argument('--known-item', type=int, default=200,
+                        help="Number of sampled title queries when no judgments file is given")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--weights', help="JSON object of BM25F field weights to evaluate")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    engine = ScopusSearchEngine(args.index)
+    if args.judgments:
+        judgments = load_judgments(args.judgments)
+    else:
+        judgments = known_item_judgments(engine, args.known_item, args.seed)
+    field_weights = json.loads(args.weights) if args.weights else None
+
+    methods = ['tfidf'] + (['bm25f'] if engine.bm25f else [])
+    print(f"📏 Evaluating {len(judgments):,} queries at k={args.k}")
+    print(f"{'method':<8} {'MRR':>7} {'nDCG':>7} {'Recall':>7} {'ms/query':>9}")
+    for method in methods:
+        engine.scoring = method
+        metrics = evaluate(engine, judgments, args.k, field_weights if method == 'bm25f' else None)
+        print(f"{method:<8} {metrics['mrr']:>7.4f} {metrics['ndcg']:>7.4f} "
+              f"{metrics['recall']:>7.4f} {metrics['latency_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
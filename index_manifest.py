@@ -0,0 +1,318 @@
+"""
+Index manifest, integrity checks and restricted loading.
+
+Step2_full_dataset.py writes a JSON manifest next to the index recording the
+schema version, build time, source-file hash, the index file's size and
+SHA-256, and a CRC32 per NumPy/SciPy array. Loading checks the size first
+(catching truncated downloads immediately), then streams the file through
+an unpickler restricted to the classes an index actually contains, hashing
+it on the way and rejecting it if the hash does not match.
+
+    python index_manifest.py verify [index_file] [--deep]
+    python index_manifest.py write [index_file] [--source ext_list_Jul_2025.xlsx]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+from scipy import sparse
+
+# Bump when the layout of index_data changes incompatibly
+SCHEMA_VERSION = 3
+
+_CHUNK_SIZE = 1 << 20
+
+# NumPy scalar types referenced by dtype parameters and pickled scalars
+_NUMPY_SCALAR_TYPES = (
+    'bool_', 'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64',
+    'float16', 'float32', 'float64', 'str_', 'bytes_',
+)
+
+# The only classes an index is built from (old and new module paths). Whole
+# packages are not allowed: e.g. numpy.memmap would let a pickle write files.
+_ALLOWED_CLASSES = {
+    ('numpy', 'ndarray'),
+    *(('numpy', name) for name in _NUMPY_SCALAR_TYPES),
+    ('scipy.sparse._csr', 'csr_matrix'),
+    ('scipy.sparse._csc', 'csc_matrix'),
+    ('scipy.sparse.csr', 'csr_matrix'),
+    ('scipy.sparse.csc', 'csc_matrix'),
+    ('sklearn.feature_extraction.text', 'TfidfVectorizer'),
+    ('sklearn.feature_extraction.text', 'TfidfTransformer'),
+    ('sklearn.feature_extraction.text', 'CountVectorizer'),
+    ('collections', 'OrderedDict'),
+    ('collections', 'defaultdict'),
+    ('journal_metadata', 'PackedStrings'),
+    ('journal_metadata', 'CompressedStrings'),
+}
+
+# Non-class callables that NumPy/SciPy pickles legitimately reference
+_ALLOWED_CALLABLES = {
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy.core.multiarray', 'scalar'),
+    ('numpy._core.multiarray', 'scalar'),
+    ('numpy', 'dtype'),
+    ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.numeric', '_frombuffer'),
+    ('copyreg', '_reconstructor'),
+    ('_codecs', 'encode'),
+}
+
+_ALLOWED_BUILTINS = {
+    'object', 'set', 'frozenset', 'slice', 'range', 'complex', 'bytes', 'bytearray',
+    'dict', 'list', 'tuple', 'int', 'float', 'str', 'bool',
+}
+
+
+class IndexIntegrityError(ValueError):
+    """Raised when an index file does not match its manifest or is unsafe to load."""
+
+
+class RestrictedUnpickler(pickle.Unpickler):
+    """Unpickler that only resolves the classes a search index is built from."""
+
+    def find_class(self, module, name):
+        if module == 'builtins' and name in _ALLOWED_BUILTINS:
+            return super().find_class(module, name)
+        if (module, name) in _ALLOWED_CALLABLES or (module, name) in _ALLOWED_CLASSES:
+            return super().find_class(module, name)
+        raise IndexIntegrityError(f"Refusing to unpickle {module}.{name} from the index")
+
+
+class _HashingReader:
+    """File wrapper that hashes every byte the unpickler reads from it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+    def readline(self, size=-1):
+        data = self.f.readline(size)
+        self.digest.update(data)
+        return data
+
+    def readinto(self, buffer):
+        n = self.f.readinto(buffer)
+        self.digest.update(memoryview(buffer)[:n])
+        return n
+
+    def hexdigest(self):
+        """Hash the unread rest of the file and return the digest."""
+        for chunk in iter(lambda: self.read(_CHUNK_SIZE), b''):
+            pass
+        return self.digest.hexdigest()
+
+
+def manifest_path(index_file):
+    """Return the manifest path belonging to an index file."""
+    return os.path.splitext(index_file)[0] + '.manifest.json'
+
+
+def file_sha256(path):
+    """Hash a file in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_arrays(value, prefix):
+    """Yield (dotted name, ndarray) for every array reachable through dicts and sparse matrices."""
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        yield prefix, value
+    elif sparse.issparse(value):
+        for part in ('data', 'indices', 'indptr'):
+            if hasattr(value, part):
+                yield f"{prefix}.{part}", getattr(value, part)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _iter_arrays(item, f"{prefix}.{key}" if prefix else str(key))
+
+
+def array_checksums(index_data):
+    """Return {array name: {'crc32', 'dtype', 'shape'}} for the arrays of an index."""
+    checksums = {}
+    for name, array in _iter_arrays(index_data, ''):
+        checksums[name] = {
+            'crc32': zlib.crc32(np.ascontiguousarray(array).view(np.uint8).ravel()),
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+        }
+    return checksums
+
+
+def write_manifest(index_file, index_data, source_file=None, source_sha256=None, data_file=None):
+    """
+    Write the manifest for a freshly saved index.
+
+    Args:
+        index_file (str): Path of the saved index
+        index_data (dict): The index that was saved
+        source_file (str): Spreadsheet the index was built from
+        source_sha256 (str): Known source hash (when the spreadsheet is no longer at hand)
+        data_file (str): File to size and hash instead of index_file (e.g. a temporary
+            file that is about to replace it)
+
+    Returns:
+        dict: The manifest that was written
+    """
+    data_file = data_file or index_file
+    manifest = {
+        'schema_version': index_data.get('schema_version', 1),
+        'built_at': index_data.get('dataset_info', {}).get('built_at')
+        or datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source_file': os.path.basename(source_file) if source_file else None,
+        'source_sha256': source_sha256 or (
+            file_sha256(source_file) if source_file and os.path.exists(source_file) else None
+        ),
+        'index_file': os.path.basename(index_file),
+        'index_size': os.path.getsize(data_file),
+        'index_sha256': file_sha256(data_file),
+        'dataset_info': {
+            key: value for key, value in index_data.get('dataset_info', {}).items()
+            if isinstance(value, (str, int, float, bool)) or value is None
+        },
+        'arrays': array_checksums(index_data),
+    }
+    with open(manifest_path(data_file), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def save_index(index_file, index_data, source_file=None, source_sha256=None):
+    """
+    Pickle an index and its manifest, replacing any previous pair.
+
+    Both files are fully written under temporary names first and then renamed
+    into place back to back, so a failed build never leaves a partial index or
+    an index paired with the previous build's manifest.
+
+    Returns:
+        dict: The manifest that was written
+    """
+    tmp_file = index_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(index_data, f)
+    manifest = write_manifest(index_file, index_data, source_file, source_sha256, data_file=tmp_file)
+    os.replace(tmp_file, index_file)
+    os.replace(manifest_path(tmp_file), manifest_path(index_file))
+    return manifest
+
+
+def read_manifest(index_file):
+    """Return the manifest of an index, or None when it has none."""
+    path = manifest_path(index_file)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_arrays(index_data, manifest):
+    """
+    Compare per-array CRC32s against the manifest.
+
+    Raises:
+        IndexIntegrityError: If an array is missing or differs
+    """
+    expected = manifest.get('arrays', {})
+    actual = array_checksums(index_data)
+    for name, info in expected.items():
+        if name not in actual:
+            raise IndexIntegrityError(f"Array '{name}' listed in the manifest is missing from the index")
+        if actual[name]['crc32'] != info['crc32'] or actual[name]['shape'] != info['shape']:
+            raise IndexIntegrityError(f"Array '{name}' does not match the manifest checksum")
+
+
+def load_index(index_file, manifest=None, require_manifest=False):
+    """
+    Read, verify and unpickle an index file in one streaming pass.
+
+    The file is hashed while the restricted unpickler reads it, so loading
+    never holds a second copy of the file in memory; a hash mismatch is
+    reported once the read completes.
+
+    Args:
+        index_file (str): Path to the pickled index
+        manifest (dict): Manifest to verify against (defaults to the sidecar file)
+        require_manifest (bool): Reject indexes that have no manifest
+
+    Returns:
+        tuple: (index_data, manifest or None)
+
+    Raises:
+        IndexIntegrityError: On size/hash/schema mismatch or disallowed pickle content
+    """
+    manifest = manifest or read_manifest(index_file)
+    if manifest is None and require_manifest:
+        raise IndexIntegrityError(f"No manifest found for '{index_file}'")
+
+    if manifest is not None:
+        if manifest.get('schema_version', 0) > SCHEMA_VERSION:
+            raise IndexIntegrityError(
+                f"Index schema version {manifest['schema_version']} is newer than supported ({SCHEMA_VERSION})"
+            )
+        size = os.path.getsize(index_file)
+        if size != manifest['index_size']:
+            raise IndexIntegrityError(
+                f"Index file is {size:,} bytes but the manifest expects {manifest['index_size']:,} "
+                "(truncated or stale download?)"
+            )
+
+    with open(index_file, 'rb') as f:
+        reader = _HashingReader(f)
+        try:
+            index_data = RestrictedUnpickler(reader).load()
+        except (pickle.UnpicklingError, EOFError, ValueError) as e:
+            if manifest is not None and reader.hexdigest() != manifest['index_sha256']:
+                raise IndexIntegrityError("Index file checksum does not match its manifest") from e
+            raise
+        if manifest is not None and reader.hexdigest() != manifest['index_sha256']:
+            raise IndexIntegrityError("Index file checksum does not match its manifest")
+
+    if manifest is not None and index_data.get('schema_version', 1) != manifest['schema_version']:
+        raise IndexIntegrityError("Index schema version does not match its manifest")
+    return index_data, manifest
+
+
+def main():
+    """Verify an index against its manifest, or (re)write the manifest."""
+    parser = argparse.ArgumentParser(description="Verify or write a search index manifest.")
+    parser.add_argument('command', choices=['verify', 'write'])
+    parser.add_argument('index_file', nargs='?', default='scopus_search_index.pkl')
+    parser.add_argument('--deep', action='store_true', help="Also verify every array checksum")
+    parser.add_argument('--source', help="Source spreadsheet to record when writing")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'write':
+            with open(args.index_file, 'rb') as f:
+                index_data = RestrictedUnpickler(f).load()
+            write_manifest(args.index_file, index_data, args.source)
+            print(f"✅ Manifest written to {manifest_path(args.index_file)}")
+        else:
+            index_data, manifest = load_index(args.index_file, require_manifest=True)
+            if args.deep:
+                verify_arrays(index_data, manifest)
+            print(f"✅ {args.index_file} matches its manifest "
+                  f"(schema v{manifest['schema_version']}, built {manifest['built_at']})")
+    except IndexIntegrityError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+Static per-journal columns derived from Scopus metadata.
+
+Everything here depends only on the source spreadsheet, so it is computed
+once by Step2_full_dataset.py and stored in the index instead of being
+recomputed for every search result.
+"""
+
+import re
+import zlib
+from datetime import date
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Wording used for the generated journal descriptions. Changing an entry only
+# requires regenerating the 'descriptions' column (see regenerate_descriptions.py).
+DESCRIPTION_TEMPLATE = {
+    'journal_line': "{title} is a scholarly journal published by {publisher}.",
+    'source_line': "{title} is a {type} published by {publisher}.",
+    'info_line': "This publication is {info}.",
+    'no_info_line': "This publication provides academic content in its field of study.",
+    'active': "currently active",
+    'inactive': "no longer active",
+    'coverage_range': "with coverage from {start} to {end}",
+    'coverage_since': "with coverage since {start}",
+    'open_access': "offering {access}",
+    'fallback': ("This is {title} published by {publisher}. "
+                 "It provides scholarly content for researchers and academics in its field."),
+}
+
+# Weights of the static per-journal prior (each signal is scaled to 0-1)
+PRIOR_WEIGHTS = {
+    'active': 0.35,
+    'coverage_length': 0.25,
+    'not_discontinued': 0.2,
+    'open_access': 0.1,
+    'medline': 0.1,
+}
+
+# Coverage spans longer than this many years get the full coverage_length signal
+PRIOR_MAX_COVERAGE_YEARS = 50
+
+# Index build profiles: 'full' keeps every structure as built; 'serving' drops
+# feature_names (the vectorizer already holds the vocabulary) and stores the
+# rarely-read per-journal texts as compressed blocks
+INDEX_PROFILES = ('full', 'serving')
+
+# Columns produced by build_columns()
+COLUMN_NAMES = (
+    'descriptions', 'coverage_start', 'coverage_end', 'coverage_range_offsets',
+    'coverage_range_starts', 'coverage_range_ends', 'added_to_list',
+    'discontinued', 'prior', 'prior_order',
+)
+
+_YEAR_PATTERN = re.compile(r'\d{4}')
+_NON_ALNUM_PATTERN = re.compile(r'[^0-9A-Za-z]')
+_TITLE_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+_RANGE_PATTERN = re.compile(r'(\d{4})(?:\s*-\s*(\d{4}|present|ongoing|current))?', re.IGNORECASE)
+
+
+def clean_value(value):
+    """Return a metadata string, mapping the 'nan' placeholder to ''."""
+    value = str(value or '')
+    return '' if value == 'nan' else value
+
+
+def coverage_ranges(coverage):
+    """
+    Parse a coverage string such as '1973-1990, 1996-2025' into year ranges.
+
+    Single years become one-year ranges and open ranges ('2015-present')
+    end at the current year.
+
+    Returns:
+        list: (start, end) integer tuples in the order they appear
+    """
+    ranges = []
+    for start, end in _RANGE_PATTERN.findall(clean_value(coverage)):
+        if not end:
+            end = start
+        elif not end.isdigit():
+            end = date.today().year
+        start, end = int(start), int(end)
+        ranges.append((min(start, end), max(start, end)))
+    return ranges
+
+
+def normalize_issn(value):
+    """
+    Normalise an ISSN to 8 upper-case characters without a hyphen.
+
+    Spreadsheet ISSNs read as numbers lose their leading zeros (and may gain
+    a '.0'), so short all-digit values are zero-padded.
+
+    Returns:
+        str: Normalised ISSN, or '' when the value cannot be an ISSN
+    """
+    value = clean_value(value).strip()
+    if value.endswith('.0'):
+        value = value[:-2]
+    value = _NON_ALNUM_PATTERN.sub('', value).upper()
+    if value.isdigit() and 4 < len(value) < 8:
+        value = value.zfill(8)
+    return value if len(value) == 8 else ''
+
+
+def normalize_title(value):
+    """Normalise a journal title for exact matching (case, punctuation, '&', leading 'The')."""
+    value = clean_value(value).lower().replace('&', ' and ')
+    value = ' '.join(_TITLE_PUNCTUATION_PATTERN.sub(' ', value).split())
+    return value[4:] if value.startswith('the ') else value
+
+
+def is_flag_set(value):
+    """Interpret a spreadsheet flag column ('Yes', 'New', 'x', ...) as a bool."""
+    return clean_value(value).strip().lower() not in ('', 'no', 'n', 'false', '0')
+
+
+class PackedStrings:
+    """Read-only list of strings stored as one UTF-8 buffer plus offsets."""
+
+    def __init__(self, strings):
+        encoded = [s.encode('utf-8') for s in strings]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.buffer[self.offsets[idx]:self.offsets[idx + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def slice(self, start, stop):
+        """Return a new PackedStrings holding rows start:stop."""
+        packed = PackedStrings([])
+        packed.offsets = self.offsets[start:stop + 1] - self.offsets[start]
+        packed.buffer = self.buffer[self.offsets[start]:self.offsets[stop]]
+        return packed
+
+
+class CompressedStrings:
+    """
+    Read-only list of strings stored as compressed blocks, decompressed on access.
+
+    Consecutive strings are grouped into blocks of block_size rows and each
+    block is compressed with zstd (zlib when the zstandard package is not
+    installed). The most recently used block is kept decompressed.
+    """
+
+    def __init__(self, strings, block_size=64, codec=None):
+        self.block_size = block_size
+        self.codec = codec or ('zstd' if zstandard is not None else 'zlib')
+        strings = list(strings)
+        self.n_rows = len(strings)
+        self.row_offsets = np.zeros(self.n_rows + 1, dtype=np.int32)  # within each block
+        blocks = []
+        for start in range(0, self.n_rows, block_size):
+            encoded = [string.encode('utf-8') for string in strings[start:start + block_size]]
+            np.cumsum([len(b) for b in encoded], out=self.row_offsets[start + 1:start + 1 + len(encoded)])
+            blocks.append(self._compress(b''.join(encoded)))
+        self.block_offsets = np.zeros(len(blocks) + 1, dtype=np.int64)
+        np.cumsum([len(block) for block in blocks], out=self.block_offsets[1:])
+        self.buffer = b''.join(blocks)
+        self._cache = (None, b'')
+
+    def _compress(self, data):
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=19).compress(data)
+        return zlib.compress(data, 9)
+
+    def _decompress(self, data):
+        if self.codec == 'zstd':
+            if zstandard is None:
+                raise ImportError("This index stores zstd-compressed texts. Install with: pip install zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def _block(self, block):
+        cached_block, data = self._cache
+        if cached_block != block:
+            data = self._decompress(self.buffer[self.block_offsets[block]:self.block_offsets[block + 1]])
+            self._cache = (block, data)
+        return data
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return CompressedStrings((self[i] for i in range(*idx.indices(len(self)))), self.block_size, self.codec)
+        if idx < 0:
+            idx += self.n_rows
+        block_start = idx - idx % self.block_size
+        data = self._block(idx // self.block_size)
+        # Offsets restart at 0 in every block, so the first row's start is implicit
+        start = self.row_offsets[idx] if idx != block_start else 0
+        return data[start:self.row_offsets[idx + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_cache', None)
+        return state
+
+    def __setstate__(self, state):
+        # Fail when the index is loaded rather than on every later access
+        if state.get('codec') == 'zstd' and zstandard is None:
+            raise ImportError("This index stores zstd-compressed texts. Install with: pip install zstandard")
+        self.__dict__.update(state)
+        self._cache = (None, b'')
+
+    @property
+    def nbytes(self):
+        """Bytes held by the compressed buffer and offset arrays."""
+        return len(self.buffer) + self.row_offsets.nbytes + self.block_offsets.nbytes
+
+
+def apply_index_profile(index_data, profile='serving'):
+    """
+    Shrink an index for serving, in place.
+
+    Args:
+        index_data (dict): Index as built by Step2_full_dataset.py
+        profile (str): One of INDEX_PROFILES
+
+    Returns:
+        dict: The same index_data
+    """
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile '{profile}' (expected one of {', '.join(INDEX_PROFILES)})")
+    if profile == 'serving':
+        index_data.pop('feature_names', None)
+        if not isinstance(index_data['texts'], CompressedStrings):
+            index_data['texts'] = CompressedStrings(index_data['texts'])
+    index_data.setdefault('dataset_info', {})['profile'] = profile
+    return index_data
+
+
+def build_description(metadata, template=None):
+    """Generate a 2-line description for a journal from its metadata dict."""
+    template = template or DESCRIPTION_TEMPLATE
+    title = clean_value(metadata.get('source_title')) or 'Unknown Journal'
+    publisher = clean_value(metadata.get('publisher')) or 'Unknown Publisher'
+    try:
+        journal_type = clean_value(metadata.get('source_type')) or 'Journal'
+        open_access = clean_value(metadata.get('open_access')).lower()
+        active_status = clean_value(metadata.get('active_status')).lower()
+        years = _YEAR_PATTERN.findall(clean_value(metadata.get('coverage')))
+
+        if journal_type.lower() == 'journal':
+            line1 = template['journal_line'].format(title=title, publisher=publisher)
+        else:
+            line1 = template['source_line'].format(title=title, type=journal_type.lower(), publisher=publisher)
+
+        info_parts = []
+        if active_status == 'active':
+            info_parts.append(template['active'])
+        elif active_status == 'inactive':
+            info_parts.append(template['inactive'])
+
+        if len(years) >= 2:
+            info_parts.append(template['coverage_range'].format(start=years[0], end=years[-1]))
+        elif years:
+            info_parts.append(template['coverage_since'].format(start=years[0]))
+
+        if open_access in ['full', 'hybrid']:
+            access_type = "full open access" if open_access == 'full' else "hybrid open access"
+            info_parts.append(template['open_access'].format(access=access_type))
+
+        if info_parts:
+            line2 = template['info_line'].format(info=', '.join(info_parts))
+        else:
+            line2 = template['no_info_line']
+
+        return f"{line1} {line2}"
+
+    except Exception:
+        return template['fallback'].format(title=title, publisher=publisher)
+
+
+def static_prior(metadatas, coverage_start, coverage_end, discontinued=None, weights=None):
+    """
+    Compute a query-independent quality prior for every journal.
+
+    Args:
+        metadatas (list): Journal metadata dicts
+        coverage_start (numpy.ndarray): First covered year per journal (0 when unknown)
+        coverage_end (numpy.ndarray): Last covered year per journal
+        discontinued (numpy.ndarray): Discontinued-for-quality flag per journal
+        weights (dict): Signal weights (defaults to PRIOR_WEIGHTS)
+
+    Returns:
+        numpy.ndarray: float32 scores in [0, 1], higher is better
+    """
+    weights = weights or PRIOR_WEIGHTS
+    if discontinued is None:
+        discontinued = np.array([is_flag_set(m.get('discontinued')) for m in metadatas], dtype=bool)
+    span = np.where(coverage_start > 0, coverage_end.astype(np.float32) - coverage_start + 1, 0)
+    signals = {
+        'active': np.array([clean_value(m.get('active_status')).lower() == 'active' for m in metadatas]),
+        'coverage_length': np.clip(span / PRIOR_MAX_COVERAGE_YEARS, 0, 1),
+        'not_discontinued': ~discontinued,
+        'open_access': np.array([is_flag_set(m.get('open_access')) for m in metadatas]),
+        'medline': np.array([is_flag_set(m.get('medline')) for m in metadatas]),
+    }
+
+    prior = np.zeros(len(metadatas), dtype=np.float32)
+    for name, weight in weights.items():
+        prior += weight * signals[name].astype(np.float32)
+    return (prior / sum(weights.values())).astype(np.float32)
+
+
+def build_columns(metadatas, template=None):
+    """
+    Compute the static columns stored alongside the index.
+
+    Coverage ranges are kept in CSR layout: the ranges of row i are
+    coverage_range_starts/ends[coverage_range_offsets[i]:coverage_range_offsets[i + 1]].
+
+    Returns:
+        dict: 'descriptions' (PackedStrings), 'coverage_start' and
+        'coverage_end' (int16 arrays, 0 when unknown), the coverage range
+        arrays, 'added_to_list' and 'discontinued' (bool arrays), 'prior'
+        (float32 array) and 'prior_order' (int32 row ids sorted by descending prior)
+    """
+    descriptions = []
+    coverage_start = np.zeros(len(metadatas), dtype=np.int16)
+    coverage_end = np.zeros(len(metadatas), dtype=np.int16)
+    added_to_list = np.zeros(len(metadatas), dtype=bool)
+    discontinued = np.zeros(len(metadatas), dtype=bool)
+    range_offsets = np.zeros(len(metadatas) + 1, dtype=np.int32)
+    range_starts = []
+    range_ends = []
+
+    for idx, metadata in enumerate(metadatas):
+        descriptions.append(build_description(metadata, template))
+        ranges = coverage_ranges(metadata.get('coverage'))
+        if ranges:
+            coverage_start[idx] = min(start for start, _ in ranges)
+            coverage_end[idx] = max(end for _, end in ranges)
+        range_starts.extend(start for start, _ in ranges)
+        range_ends.extend(end for _, end in ranges)
+        range_offsets[idx + 1] = len(range_starts)
+        added_to_list[idx] = is_flag_set(metadata.get('added_to_list'))
+        discontinued[idx] = is_flag_set(metadata.get('discontinued'))
+
+    prior = static_prior(metadatas, coverage_start, coverage_end, discontinued)
+
+    return {
+        'descriptions': PackedStrings(descriptions),
+        'coverage_start': coverage_start,
+        'coverage_end': coverage_end,
+        'coverage_range_offsets': range_offsets,
+        'coverage_range_starts': np.array(range_starts, dtype=np.int16),
+        'coverage_range_ends': np.array(range_ends, dtype=np.int16),
+        'added_to_list': added_to_list,
+        'discontinued': discontinued,
+        'prior': prior,
+        'prior_order': np.argsort(-prior, kind='stable').astype(np.int32),
+    }
+
+
+def ensure_columns(index_data, template=None):
+    """
+    Return index_data['columns'], deriving any columns an older index lacks.
+
+    Columns already stored in the index are kept as they are.
+    """
+    columns = index_data.setdefault('columns', {})
+    if not set(COLUMN_NAMES) <= columns.keys():
+        for name, values in build_columns(index_data['metadatas'], template).items():
+            columns.setdefault(name, values)
+    return columns
+
+
+def slice_columns(columns, start, stop):
+    """
+    Return the columns of rows start:stop, e.g. for one shard of the index.
+
+    Row-aligned arrays are sliced, the CSR coverage ranges are re-based and
+    prior_order is recomputed over the slice.
+    """
+    sliced = {}
+    for name, values in columns.items():
+        if name == 'descriptions':
+            sliced[name] = values.slice(start, stop)
+        elif name in ('coverage_range_starts', 'coverage_range_ends', 'prior_order'):
+            continue
+        elif name == 'coverage_range_offsets':
+            sliced[name] = values[start:stop + 1] - values[start]
+        else:
+            sliced[name] = values[start:stop]
+
+    offsets = columns['coverage_range_offsets']
+    for name in ('coverage_range_starts', 'coverage_range_ends'):
+        sliced[name] = columns[name][offsets[start]:offsets[stop]]
+    sliced['prior_order'] = np.argsort(-sliced['prior'], kind='stable').astype(np.int32)
+    return sliced
@@ -0,0 +1,163 @@
+"""
+Memory report for a loaded ScopusSearchEngine.
+
+Loads the index the way the web app does and prints how much memory each
+component holds: every top-level structure of the pickled index (TF-IDF
+matrix, vectorizer, texts, metadata, columns, BM25F fields, ...) and the
+lookup tables the engine derives on load. Process RSS is sampled before
+loading, after unpickling and after the engine is ready, so the component
+sizes can be compared with what the process actually uses.
+
+    python memory_report.py [index_file] [--profile serving] [--json]
+
+--profile applies an index profile in memory first, to preview the savings
+of rebuilding with SCOPUS_INDEX_PROFILE=serving.
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+
+import numpy as np
+from scipy import sparse
+
+from index_manifest import load_index
+from journal_metadata import INDEX_PROFILES, CompressedStrings, PackedStrings, apply_index_profile
+from search_scopus import ScopusSearchEngine
+
+# Engine attributes derived on load rather than stored in the index
+DERIVED_ATTRIBUTES = ('row_by_id', 'issn_index', 'title_index', 'range_rows', 'not_discontinued', 'prior_boost',
+                      'active')
+
+
+def current_rss():
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Peak RSS: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def deep_sizeof(value, seen=None):
+    """
+    Estimate the bytes held by an object graph, counting shared objects once.
+
+    NumPy arrays, SciPy sparse matrices and packed string columns are sized by
+    their buffers; other objects are walked through their containers and
+    instance attributes.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        size = value.nbytes + sys.getsizeof(value) - (value.nbytes if value.flags.owndata else 0)
+        if value.dtype == object:
+            size += sum(deep_sizeof(item, seen) for item in value.ravel())
+        return size
+    if sparse.issparse(value):
+        return sum(deep_sizeof(getattr(value, part), seen)
+                   for part in ('data', 'indices', 'indptr', 'row', 'col') if hasattr(value, part))
+    if isinstance(value, (PackedStrings, CompressedStrings)):
+        return sum(deep_sizeof(item, seen) for item in vars(value).values())
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        size += deep_sizeof(vars(value), seen)
+    return size
+
+
+def memory_report(index_file, profile=None):
+    """
+    Load an index into a search engine and measure its components.
+
+    Args:
+        index_file (str): Path to the pickled index
+        profile (str): Index profile to apply in memory before building the engine
+
+    Returns:
+        dict: 'rss' (bytes at each stage), 'index' and 'derived' (bytes per component)
+    """
+    gc.collect()
+    rss = {'baseline': current_rss()}
+
+    index_data, _ = load_index(index_file)
+    gc.collect()
+    rss['index_loaded'] = current_rss()
+
+    if profile:
+        apply_index_profile(index_data, profile)
+        gc.collect()
+        rss['profile_applied'] = current_rss()
+
+    engine = ScopusSearchEngine(index_data=index_data)
+    gc.collect()
+    rss['engine_ready'] = current_rss()
+
+    # Objects shared between components (e.g. sourcerecord_id strings reused as
+    # dict keys by the derived tables) are counted once, under the index
+    seen = set()
+    components = {name: deep_sizeof(value, seen) for name, value in index_data.items()}
+    derived = {name: deep_sizeof(getattr(engine, name), seen) for name in DERIVED_ATTRIBUTES
+               if getattr(engine, name, None) is not None}
+
+    return {
+        'index_file': index_file,
+        'profile': index_data.get('dataset_info', {}).get('profile', 'full'),
+        'rss': rss,
+        'index': dict(sorted(components.items(), key=lambda item: -item[1])),
+        'derived': dict(sorted(derived.items(), key=lambda item: -item[1])),
+    }
+
+
+def _mb(n_bytes):
+    return n_bytes / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down the memory used by a loaded search engine.")
+    parser.add_argument('index_file', nargs='?', default='scopus_search_index.pkl')
+    parser.add_argument('--profile', choices=INDEX_PROFILES, help="Apply an index profile in memory first")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.index_file):
+        print(f"❌ Index file '{args.index_file}' not found. Please run Step2_full_dataset.py first.")
+        sys.exit(1)
+
+    report = memory_report(args.index_file, args.profile)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    rss = report['rss']
+    total = sum(report['index'].values()) + sum(report['derived'].values())
+    print(f"🧠 Memory report for {args.index_file} ({report['profile']} profile, "
+          f"file {_mb(os.path.getsize(args.index_file)):.1f} MB)\n")
+    for section in ('index', 'derived'):
+        print(f"{'index component' if section == 'index' else 'derived on load':<20} {'MB':>9} {'share':>7}")
+        for name, n_bytes in report[section].items():
+            print(f"  {name:<18} {_mb(n_bytes):>9.2f} {n_bytes / total if total else 0:>7.1%}")
+        print()
+
+    print(f"📊 Components total: {_mb(total):.1f} MB")
+    previous = rss['baseline']
+    print(f"   RSS baseline:         {_mb(previous):.1f} MB")
+    for stage, value in list(rss.items())[1:]:
+        print(f"   RSS {stage.replace('_', ' ') + ':':<17} {_mb(value):.1f} MB ({_mb(value - previous):+.1f} MB)")
+        previous = value
+
+
+if __name__ == "__main__":
+    main()
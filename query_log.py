@@ -0,0 +1,82 @@
+"""
+Low-overhead query logging for capacity planning.
+
+Request handlers call QueryLogger.log(), which only samples and enqueues a
+record; a background thread batches records and appends them as JSON lines.
+When the queue is full records are dropped rather than slowing requests down.
+
+Enable it in app.py with environment variables:
+
+    SCOPUS_QUERY_LOG=query_log.jsonl     # log file (unset = disabled)
+    SCOPUS_QUERY_LOG_SAMPLE=0.1          # fraction of requests to record
+"""
+
+import atexit
+import json
+import queue
+import random
+import threading
+import time
+
+
+class QueryLogger:
+    """Sampled, buffered, append-only JSON lines query log."""
+
+    def __init__(self, path, sample_rate=1.0, flush_interval=1.0, batch_size=256, max_queue=10000):
+        """
+        Args:
+            path (str): File to append records to
+            sample_rate (float): Fraction of records to keep (0-1)
+            flush_interval (float): Maximum seconds a record waits before being written
+            batch_size (int): Records written per batch
+            max_queue (int): Records buffered before new ones are dropped
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='query-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, record):
+        """Sample and enqueue a record without blocking the caller."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        record.setdefault('ts', time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+
+    def close(self):
+        """Flush buffered records and stop the writer thread."""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._thread.join(timeout=self.flush_interval + 5)
+
+
+def read_query_log(path):
+    """Yield the records of a query log, skipping torn or malformed lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
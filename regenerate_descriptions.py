@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Regenerate the precomputed journal descriptions in an existing index.
+
+Use this after changing DESCRIPTION_TEMPLATE in journal_metadata.py (or pass a
+JSON file with replacement template entries) instead of rebuilding the whole
+TF-IDF index.
+
+    python regenerate_descriptions.py [index_file] [--template template.json]
+"""
+
+import argparse
+import json
+import os
+import pickle
+
+from index_manifest import load_index, save_index
+from journal_metadata import DESCRIPTION_TEMPLATE, PackedStrings, build_description, ensure_columns
+
+
+def main():
+    """Rebuild the descriptions column and write the index back in place."""
+    parser = argparse.ArgumentParser(description="Regenerate precomputed journal descriptions.")
+    parser.add_argument('index_file', nargs='?', default='scopus_search_index.pkl')
+    parser.add_argument('--template', help="JSON file overriding DESCRIPTION_TEMPLATE entries")
+    args = parser.parse_args()
+
+    template = dict(DESCRIPTION_TEMPLATE)
+    if args.template:
+        with open(args.template, 'r', encoding='utf-8') as f:
+            template.update(json.load(f))
+
+    print(f"📚 Loading {args.index_file}...")
+    index_data, manifest = load_index(args.index_file)
+
+    # Only the descriptions are replaced: prior/prior_order must stay as they
+    # are, because subject_index stores postings as prior ranks
+    columns = ensure_columns(index_data, template)
+    columns['descriptions'] = PackedStrings(build_description(metadata, template)
+                                            for metadata in index_data['metadatas'])
+
+    if manifest:
+        save_index(args.index_file, index_data, manifest.get('source_file'), manifest.get('source_sha256'))
+    else:
+        tmp_file = args.index_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(index_data, f)
+        os.replace(tmp_file, args.index_file)
+
+    print(f"✅ Regenerated {len(columns['descriptions']):,} descriptions in {args.index_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Replay a captured query log against the search engine or a running server.
+
+Records written by QueryLogger (app.py with SCOPUS_QUERY_LOG set) are
+re-issued either directly against an in-process ScopusSearchEngine, using
+the exact engine arguments that were logged, or over HTTP by POSTing the
+original request bodies to /search. Requests can be replayed at the
+captured arrival rate (scaled by --speedup) or as fast as the concurrency
+allows, and latency percentiles and error rates are reported overall and
+per query type. Server errors and client errors (requests the server
+rejected with a 4xx status) are counted separately. With --speedup,
+latency is measured from each request's scheduled send time, so queueing
+behind too little concurrency shows up in the percentiles.
+
+    python replay_queries.py query_log.jsonl
+    python replay_queries.py query_log.jsonl --url http://localhost:5000 --concurrency 16 --speedup 4
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from query_log import read_query_log
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Outcomes a runner reports for one replayed request
+OK, CLIENT_ERROR, ERROR = 'ok', 'client_error', 'error'
+
+
+def load_replay_records(path, limit=None, engine_only=False):
+    """
+    Return the replayable records of a query log, oldest first.
+
+    With engine_only, requests that were rejected before reaching the engine
+    (and so have no engine arguments) are skipped.
+    """
+    records = []
+    for record in read_query_log(path):
+        if record.get('engine_args') is None and (engine_only or not record.get('request')):
+            continue
+        records.append(record)
+        if limit and len(records) >= limit:
+            break
+    records.sort(key=lambda record: record.get('ts', 0))
+    return records
+
+
+def engine_runner(engine):
+    """Return a function replaying one record against an in-process engine."""
+    def run(record):
+        engine.search(**record['engine_args'], raise_errors=True)
+        return OK
+    return run
+
+
+def http_runner(url, timeout=30):
+    """Return a function replaying one record by POSTing it to {url}/search."""
+    endpoint = url.rstrip('/') + '/search'
+
+    def run(record):
+        body = json.dumps(record.get('request') or {}).encode('utf-8')
+        req = urllib.request.Request(endpoint, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                response.read()
+                return OK
+        except urllib.error.HTTPError as e:
+            e.read()
+            return CLIENT_ERROR if e.code < 500 else ERROR
+    return run
+
+
+def replay(records, run, concurrency=1, speedup=0.0):
+    """
+    Replay records and time each one.
+
+    Args:
+        records (list): Query log records, oldest first
+        run (callable): Replays one record and returns OK, CLIENT_ERROR or ERROR (raising counts as ERROR)
+        concurrency (int): Requests in flight at once
+        speedup (float): Replay the captured inter-arrival times this many times
+            faster; 0 replays as fast as possible
+
+    Returns:
+        tuple: (list of (query_type, latency seconds, outcome) tuples, wall-clock seconds)
+    """
+    timings = []
+    lock = threading.Lock()
+
+    def timed(record, scheduled):
+        # At a fixed arrival rate, time from the scheduled send so queueing counts
+        started = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            outcome = run(record)
+        except Exception:
+            outcome = ERROR
+        elapsed = time.perf_counter() - started
+        with lock:
+            timings.append((record.get('query_type', 'unknown'), elapsed, outcome))
+
+    first_ts = records[0].get('ts', 0) if records else 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            scheduled = None
+            if speedup > 0:
+                scheduled = started + (record.get('ts', first_ts) - first_ts) / speedup
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(timed, record, scheduled)
+    return timings, time.perf_counter() - started
+
+
+def summarize(timings, wall_time):
+    """Return latency percentiles, error rates and throughput overall and per query type."""
+    def stats(group):
+        latencies = np.array([latency for _, latency, _ in group]) * 1000
+        outcomes = [outcome for _, _, outcome in group]
+        summary = {
+            'count': len(group),
+            'error_rate': outcomes.count(ERROR) / len(group) if group else 0.0,
+            'client_error_rate': outcomes.count(CLIENT_ERROR) / len(group) if group else 0.0,
+            'mean_ms': float(latencies.mean()) if len(group) else 0.0,
+            'max_ms': float(latencies.max()) if len(group) else 0.0,
+        }
+        for p in PERCENTILES:
+            summary[f'p{p}_ms'] = float(np.percentile(latencies, p)) if len(group) else 0.0
+        return summary
+
+    report = {'overall': stats(timings)}
+    report['overall']['throughput_qps'] = len(timings) / wall_time if wall_time else 0.0
+    for query_type in sorted({query_type for query_type, _, _ in timings}):
+        report[query_type] = stats([timing for timing in timings if timing[0] == query_type])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured query log and report latency percentiles.")
+    parser.add_argument('log_file', help="Query log written by QueryLogger (JSON lines)")
+    parser.add_argument('--url', help="Replay over HTTP against this server instead of an in-process engine")
+    parser.add_argument('--index', default='scopus_search_index.pkl', help="Index for in-process replay")
+    parser.add_argument('--concurrency', type=int, default=1, help="Requests in flight at once")
+    parser.add_argument('--speedup', type=float, default=0.0,
+                        help="Replay at N x the captured arrival rate (0 = as fast as possible)")
+    parser.add_argument('--limit', type=int, help="Replay at most this many records")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    records = load_replay_records(args.log_file, args.limit, engine_only=not args.url)
+    if not records:
+        print(f"❌ No replayable records in {args.log_file}")
+        sys.exit(1)
+
+    if args.url:
+        run = http_runner(args.url)
+        target = args.url
+    else:
+        from search_scopus import ScopusSearchEngine
+        run = engine_runner(ScopusSearchEngine(args.index))
+        target = args.index
+
+    print(f"🔁 Replaying {len(records):,} queries against {target} "
+          f"(concurrency {args.concurrency}, {'speedup ' + str(args.speedup) + 'x' if args.speedup else 'max rate'})")
+    timings, wall_time = replay(records, run, args.concurrency, args.speedup)
+    report = summarize(timings, wall_time)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{'type':<10} {'count':>7} {'errors':>7} {'4xx':>7} "
+          + ' '.join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f" {'max':>8}")
+    for name, summary in report.items():
+        print(f"{name:<10} {summary['count']:>7,} {summary['error_rate']:>6.1%} {summary['client_error_rate']:>6.1%} "
+              + ' '.join(f"{summary[f'p{p}_ms']:>6.1f}ms" for p in PERCENTILES)
+              + f" {summary['max_ms']:>6.1f}ms")
+    print(f"\n⚡ Throughput: {report['overall']['throughput_qps']:,.1f} queries/s over {wall_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
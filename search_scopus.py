@@ -1,31 +1,110 @@
-import pickle
+import argparse
 import os
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
+from journal_metadata import ensure_columns, normalize_issn, normalize_title
+from subject_index import SubjectIndex, build_subject_index
+from bm25f import BM25FScorer
+from index_manifest import load_index
 
 class ScopusSearchEngine:
     """A simple search engine for Scopus journal data."""
     
-    def __init__(self, index_file='scopus_search_index.pkl'):
-        """Initialize the search engine with the saved index."""
-        if not os.path.exists(index_file):
-            raise FileNotFoundError(f"Index file '{index_file}' not found. Please run Step2_full_dataset.py first.")
+    def __init__(self, index_file='scopus_search_index.pkl', scoring='auto', field_weights=None, index_data=None,
+                 require_manifest=False, prior_weight=0.1):
+        """
+        Initialize the search engine with the saved index.
         
-        print(f"📚 Loading Scopus search index from {index_file}...")
-        with open(index_file, 'rb') as f:
-            self.index_data = pickle.load(f)
+        Args:
+            index_file (str): Path to the pickled index
+            scoring (str): 'bm25f', 'tfidf', or 'auto' (BM25F when the index has it)
+            field_weights (dict): BM25F field boosts overriding the defaults
+            index_data (dict): Already-loaded index data (e.g. a shard); index_file is then ignored
+            require_manifest (bool): Refuse to load an index without a manifest
+            prior_weight (float): How strongly the static prior boosts text scores (0 disables it)
+        
+        Raises:
+            IndexIntegrityError: If the index file does not match its manifest
+        """
+        verbose = index_data is None
+        if index_data is None:
+            if not os.path.exists(index_file):
+                raise FileNotFoundError(f"Index file '{index_file}' not found. Please run Step2_full_dataset.py first.")
+            
+            print(f"📚 Loading Scopus search index from {index_file}...")
+            index_data, self.manifest = load_index(index_file, require_manifest=require_manifest)
+            if self.manifest:
+                print(f"🔒 Verified against manifest (schema v{self.manifest['schema_version']}, "
+                      f"built {self.manifest['built_at']})")
+            else:
+                print("⚠️ No index manifest found; skipping integrity check")
+        else:
+            self.manifest = None
+        self.index_data = index_data
         
         self.tfidf_matrix = self.index_data['tfidf_matrix']
         self.vectorizer = self.index_data['vectorizer']
         self.texts = self.index_data['texts']
         self.metadatas = self.index_data['metadatas']
         
-        info = self.index_data['dataset_info']
-        print(f"✅ Index loaded successfully!")
-        print(f"   - {info['total_documents']:,} journals")
-        print(f"   - {info['total_features']:,} search features")
-        print()
+        # Static columns are precomputed by Step2_full_dataset.py; older
+        # indexes without them get the same columns derived once on load.
+        self.columns = ensure_columns(self.index_data)
+        self.descriptions = self.columns['descriptions']
+        self.coverage_start = self.columns['coverage_start']
+        self.coverage_end = self.columns['coverage_end']
+        self.added_to_list = self.columns['added_to_list']
+        self.range_starts = self.columns['coverage_range_starts']
+        self.range_ends = self.columns['coverage_range_ends']
+        self.range_rows = np.repeat(
+            np.arange(len(self.metadatas), dtype=np.int32),
+            np.diff(self.columns['coverage_range_offsets'])
+        )
+        self.prior = self.columns['prior']
+        self.prior_order = self.columns['prior_order']
+        self.prior_weight = prior_weight
+        self.not_discontinued = ~self.columns['discontinued']
+        self.active = np.array([str(metadata.get('active_status', '')).lower() == 'active'
+                                for metadata in self.metadatas], dtype=bool)
+        # Text scores are multiplied by this per-row boost, so equal scores are
+        # ordered by the prior and the best possible score stays at 1.0
+        self.prior_boost = ((1 + prior_weight * self.prior) / (1 + prior_weight)).astype(np.float32)
+        if 'subject_index' not in self.index_data:
+            self.index_data['subject_index'] = build_subject_index(self.metadatas, self.prior_order)
+        self.subject_index = SubjectIndex(self.index_data['subject_index'])
+        
+        self.bm25f = None
+        if 'bm25f' in self.index_data:
+            self.bm25f = BM25FScorer(self.index_data['bm25f'], field_weights=field_weights)
+        elif scoring == 'bm25f':
+            raise ValueError("Index has no BM25F fields. Rebuild it with Step2_full_dataset.py.")
+        self.scoring = 'bm25f' if self.bm25f and scoring in ('auto', 'bm25f') else 'tfidf'
+        
+        self.neighbors = self.index_data.get('neighbors')
+        self.row_by_id = {metadata.get('sourcerecord_id'): idx for idx, metadata in enumerate(self.metadatas)}
+        
+        # Exact-match lookup tables: normalised ISSN/eISSN and title -> rows
+        self.issn_index = {}
+        self.title_index = {}
+        for idx, metadata in enumerate(self.metadatas):
+            for issn in {normalize_issn(metadata.get('issn')), normalize_issn(metadata.get('eissn'))}:
+                if issn:
+                    self.issn_index.setdefault(issn, []).append(idx)
+            title = normalize_title(metadata.get('source_title'))
+            if title:
+                self.title_index.setdefault(title, []).append(idx)
+        
+        if verbose:
+            info = self.index_data['dataset_info']
+            print(f"✅ Index loaded successfully!")
+            print(f"   - {info['total_documents']:,} journals")
+            print(f"   - {info['total_features']:,} search features")
+            print(f"   - {self.scoring.upper()} scoring")
+            print()
     
-    def search(self, query, top_k=10, min_score=0.1):
+    def search(self, query, top_k=10, min_score=0.1, start_year_max=None, end_year_min=None,
+               covered_year=None, added_only=False, subjects=None, subject_mode='or', field_weights=None,
+               exclude_discontinued=False, raise_errors=False):
         """
         Search for journals matching the query or ISSN.
         
@@ -33,42 +112,31 @@ class ScopusSearchEngine:
             query (str): Search query or ISSN number
             top_k (int): Maximum number of results to return
             min_score (float): Minimum similarity score (0-1)
+            start_year_max (int): Only journals whose coverage starts in or before this year
+            end_year_min (int): Only journals covered through at least this year
+            covered_year (int): Only journals with a coverage range containing this year
+            added_only (bool): Only journals added to the current Scopus list
+            subjects (list): ASJC codes or 2-digit major areas to restrict to
+            subject_mode (str): 'or' to match any subject, 'and' to match all
+            field_weights (dict): Per-query BM25F field boosts, e.g. {'title': 5.0}
+            exclude_discontinued (bool): Leave out titles discontinued by Scopus for quality issues
+            raise_errors (bool): Re-raise errors instead of returning no results
         
         Returns:
             list: List of search results with scores and metadata
         """
         try:
-            # Check if query looks like an ISSN (format: XXXX-XXXX or XXXXXXXX)
+            mask = self.filter_mask(start_year_max, end_year_min, covered_year, added_only,
+                                    subjects, subject_mode, exclude_discontinued)
+            
             issn_pattern = query.replace('-', '').replace(' ', '')
-            is_issn_search = (len(issn_pattern) == 8 and issn_pattern.isdigit()) or ('-' in query and len(query.replace('-', '')) == 8)
             
-            if is_issn_search:
+            if self.is_issn_query(query):
                 # Direct ISSN search
                 results = []
-                for idx, metadata in enumerate(self.metadatas):
-                    issn_match = (
-                        issn_pattern in metadata['issn'].replace('-', '') or
-                        issn_pattern in metadata['eissn'].replace('-', '') or
-                        query in metadata['issn'] or
-                        query in metadata['eissn']
-                    )
-                    
-                    if issn_match:
-                        results.append({
-                            'score': 1.0,  # Perfect match for ISSN
-                            'rank': len(results) + 1,
-                            'title': metadata['source_title'],
-                            'publisher': metadata['publisher'],
-                            'type': metadata['source_type'],
-                            'issn': metadata['issn'],
-                            'eissn': metadata['eissn'],
-                            'open_access': metadata['open_access'],
-                            'active_status': metadata['active_status'],
-                            'coverage': metadata['coverage'],
-                            'language': metadata['language'],
-                            'sourcerecord_id': metadata['sourcerecord_id'],
-                            'full_text': self.texts[idx]
-                        })
+                for idx in self.issn_index.get(normalize_issn(issn_pattern), []):
+                    if mask is None or mask[idx]:
+                        results.append(self._format_result(idx, 1.0, len(results) + 1))  # Perfect match for ISSN
                         
                         if len(results) >= top_k:
                             break
@@ -77,35 +145,248 @@ class ScopusSearchEngine:
             
             else:
                 # Regular text search
-                query_vec = self.vectorizer.transform([query])
-                scores = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
-                top_indices = scores.argsort()[-top_k:][::-1]
+                scores = self.text_scores(query, field_weights)
+                if mask is None:
+                    top_indices = self._top_indices(scores, top_k)
+                else:
+                    # Rank only the rows passing the filters (ascending, so ties keep row order)
+                    rows = np.flatnonzero(mask)
+                    top_indices = rows[self._top_indices(scores[rows], top_k)]
                 
                 results = []
                 for idx in top_indices:
                     if scores[idx] >= min_score:
-                        results.append({
-                            'score': scores[idx],
-                            'rank': len(results) + 1,
-                            'title': self.metadatas[idx]['source_title'],
-                            'publisher': self.metadatas[idx]['publisher'],
-                            'type': self.metadatas[idx]['source_type'],
-                            'issn': self.metadatas[idx]['issn'],
-                            'eissn': self.metadatas[idx]['eissn'],
-                            'open_access': self.metadatas[idx]['open_access'],
-                            'active_status': self.metadatas[idx]['active_status'],
-                            'coverage': self.metadatas[idx]['coverage'],
-                            'language': self.metadatas[idx]['language'],
-                            'sourcerecord_id': self.metadatas[idx]['sourcerecord_id'],
-                            'full_text': self.texts[idx]
-                        })
+                        results.append(self._format_result(idx, scores[idx], len(results) + 1))
                 
                 return results
             
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"❌ Search error: {e}")
             return []
     
+    @staticmethod
+    def is_issn_query(query):
+        """Check if query looks like an ISSN (format: XXXX-XXXX or XXXXXXXX)."""
+        issn_pattern = query.replace('-', '').replace(' ', '')
+        return (len(issn_pattern) == 8 and issn_pattern.isdigit()) or ('-' in query and len(query.replace('-', '')) == 8)
+    
+    def text_scores(self, query, field_weights=None):
+        """Score every journal against a free-text query with the active scoring method, boosted by the prior."""
+        if self.scoring == 'bm25f':
+            scores = self.bm25f.score(query, field_weights)
+        else:
+            query_vec = self.vectorizer.transform([query])
+            scores = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
+        scores *= self.prior_boost
+        return scores
+    
+    def filter_mask(self, start_year_max=None, end_year_min=None, covered_year=None, added_only=False,
+                    subjects=None, subject_mode='or', exclude_discontinued=False):
+        """
+        Build a boolean row mask for the coverage, list, subject and discontinued filters.
+        
+        Returns:
+            numpy.ndarray or None: Rows passing every filter, or None when no filter is set
+        """
+        if (start_year_max is None and end_year_min is None and covered_year is None
+                and not added_only and not subjects and not exclude_discontinued):
+            return None
+        
+        mask = np.ones(len(self.metadatas), dtype=bool)
+        if start_year_max is not None:
+            mask &= (self.coverage_start > 0) & (self.coverage_start <= start_year_max)
+        if end_year_min is not None:
+            mask &= self.coverage_end >= end_year_min
+        if covered_year is not None:
+            in_range = (self.range_starts <= covered_year) & (self.range_ends >= covered_year)
+            covered = np.zeros(len(self.metadatas), dtype=bool)
+            covered[self.range_rows[in_range]] = True
+            mask &= covered
+        if added_only:
+            mask &= self.added_to_list
+        if subjects:
+            in_subjects = np.zeros(len(self.metadatas), dtype=bool)
+            in_subjects[self.prior_order[self.subject_index.lookup(subjects, subject_mode)]] = True
+            mask &= in_subjects
+        if exclude_discontinued:
+            mask &= self.not_discontinued
+        return mask
+    
+    def browse_subjects(self, subjects, mode='or', offset=0, limit=20):
+        """
+        Page through the journals of one or more subjects, best prior first.
+        
+        Args:
+            subjects (list): ASJC codes or 2-digit major areas
+            mode (str): 'or' to match any subject, 'and' to match all
+            offset (int): Number of journals to skip
+            limit (int): Maximum number of journals to return
+        
+        Returns:
+            tuple: (total matching journals, list of results)
+        """
+        ranks = self.subject_index.lookup(subjects, mode)
+        rows = self.prior_order[ranks[offset:offset + limit]]
+        results = [
+            self._format_result(idx, float(self.prior[idx]), offset + i + 1)
+            for i, idx in enumerate(rows)
+        ]
+        return len(ranks), results
+    
+    @staticmethod
+    def _top_indices(scores, top_k):
+        """Return the indices of the top_k scores, best first; equal scores keep row order."""
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return np.array([], dtype=np.int64)
+        
+        # Usually most rows score 0 (or -1 when masked). Partitioning or sorting
+        # such heavily tied arrays is slow, so only the positive scores are
+        # ranked and ties are filled in row order without sorting them.
+        positive = np.flatnonzero(scores > 0)
+        if len(positive) >= top_k:
+            positive_scores = scores[positive]
+            threshold = positive_scores[np.argpartition(positive_scores, -top_k)[-top_k:]].min()
+            above = positive[positive_scores > threshold]
+            selected = [above[np.lexsort((above, -scores[above]))]]
+            selected.append(positive[positive_scores == threshold][:top_k - len(above)])
+            return np.concatenate(selected)
+        
+        selected = [positive[np.lexsort((positive, -scores[positive]))]]
+        needed = top_k - len(positive)
+        rest = np.flatnonzero(scores <= 0)
+        while needed > 0:
+            value = scores[rest].max()
+            tied = rest[scores[rest] == value]
+            selected.append(tied[:needed])
+            needed -= len(selected[-1])
+            rest = rest[scores[rest] < value]
+        return np.concatenate(selected)
+    
+    def match(self, name=None, issn=None, min_score=0.5):
+        """
+        Resolve a journal name and/or ISSN to a single journal.
+        
+        ISSNs are tried first, then an exact (normalised) title match, then
+        the best text-search hit if it scores at least min_score and more
+        than half of the name's words (as tokenised by the index) occur in
+        its title, so names of journals that are not in Scopus resolve to
+        nothing instead of to a journal sharing one word.
+        
+        Args:
+            name (str): Journal name as cited
+            issn (str): ISSN or eISSN in any common format
+            min_score (float): Minimum score for a text-search match
+        
+        Returns:
+            tuple: (match type, result dict) or (None, None) when nothing matches
+        """
+        for value in str(issn or '').replace(',', ';').split(';'):
+            rows = self.issn_index.get(normalize_issn(value))
+            if rows:
+                return 'issn', self._format_result(rows[0], 1.0, 1)
+        
+        if name and str(name).strip():
+            rows = self.title_index.get(normalize_title(name))
+            if rows:
+                return 'title', self._format_result(rows[0], 1.0, 1)
+            
+            results = self.search(str(name), top_k=1, min_score=min_score)
+            if results and self._title_coverage(name, results[0]['title']) > 0.5:
+                return 'search', results[0]
+        
+        return None, None
+    
+    def _title_coverage(self, name, title):
+        """Return the share of the words of name that also occur in title."""
+        analyze = self.vectorizer.build_analyzer()
+        words = {term for term in analyze(str(name)) if ' ' not in term}
+        if not words:
+            return 0.0
+        return len(words & set(analyze(str(title)))) / len(words)
+    
+    def similar(self, sourcerecord_id, k=10, active_only=False):
+        """
+        Find journals similar to the given journal ("more like this").
+        
+        Uses the neighbour table precomputed by Step2_full_dataset.py and
+        falls back to a single sparse product when the index has no table,
+        more neighbours are requested than it stores, or active_only leaves
+        fewer than k of the stored neighbours.
+        
+        Args:
+            sourcerecord_id (str): Scopus source record ID of the journal
+            k (int): Maximum number of similar journals to return
+            active_only (bool): Only return active journals
+        
+        Returns:
+            list: Search results ranked by similarity
+        
+        Raises:
+            KeyError: If the source record ID is not in the index
+        """
+        idx = self.row_by_id[str(sourcerecord_id)]
+        
+        if self.neighbors is not None and k <= self.neighbors['neighbors'].shape[1]:
+            rows = self.neighbors['neighbors'][idx]
+            scores = self.neighbors['scores'][idx].astype(np.float32)
+            keep = scores > 0
+            if active_only:
+                keep &= self.active[rows]
+            if keep.sum() >= k or not active_only:
+                rows = rows[keep][:k]
+                return [self._format_result(int(row), float(score), rank)
+                        for rank, (row, score) in enumerate(zip(rows, scores[keep][:k]), 1)]
+        
+        scores = (self.tfidf_matrix[idx] @ self.tfidf_matrix.T).toarray().ravel()
+        scores[idx] = -1.0
+        if active_only:
+            scores[~self.active] = -1.0
+        rows = [row for row in self._top_indices(scores, k) if scores[row] > 0]
+        return [self._format_result(int(row), float(scores[row]), rank) for rank, row in enumerate(rows, 1)]
+    
+    def _format_result(self, idx, score, rank):
+        """Build the result dict for the journal at row idx."""
+        metadata = self.metadatas[idx]
+        return {
+            'score': score,
+            'rank': rank,
+            'title': metadata['source_title'],
+            'publisher': metadata['publisher'],
+            'type': metadata['source_type'],
+            'issn': metadata['issn'],
+            'eissn': metadata['eissn'],
+            'open_access': metadata['open_access'],
+            'active_status': metadata['active_status'],
+            'coverage': metadata['coverage'],
+            'coverage_start': int(self.columns['coverage_start'][idx]),
+            'coverage_end': int(self.columns['coverage_end'][idx]),
+            'language': metadata['language'],
+            'subject_areas': metadata['asjc_codes'],
+            'sourcerecord_id': metadata['sourcerecord_id'],
+            'description': self.descriptions[idx]
+        }
+    
+    def full_text(self, sourcerecord_id):
+        """
+        Return the indexed text of a journal.
+        
+        Kept out of search results: under the serving profile the texts are
+        compressed blocks, so they are only decoded when explicitly requested.
+        
+        Args:
+            sourcerecord_id (str): Scopus source record ID of the journal
+        
+        Returns:
+            str: The text the journal was indexed with
+        
+        Raises:
+            KeyError: If the source record ID is not in the index
+        """
+        return self.texts[self.row_by_id[str(sourcerecord_id)]]
+    
     def print_results(self, results, show_details=False):
         """Print search results in a formatted way."""
         if not results:
@@ -189,13 +470,31 @@ class ScopusSearchEngine:
                 print(f"Error: {e}")
 
 def main():
-    """Main function to run the search interface."""
+    """Main function to run the interactive or bulk search interface."""
+    parser = argparse.ArgumentParser(description="Search the Scopus journal index.")
+    parser.add_argument('--index', default='scopus_search_index.pkl', help="Path to the search index")
+    parser.add_argument('--bulk', metavar='INPUT', help="Match a CSV or BibTeX file of journal names/ISSNs")
+    parser.add_argument('--output', help="Bulk output file (.csv or .jsonl)")
+    parser.add_argument('--workers', type=int, help="Bulk worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Records per bulk task")
+    parser.add_argument('--min-score', type=float, default=0.5, help="Minimum score for text-search matches")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted bulk run")
+    args = parser.parse_args()
+    
+    if args.bulk and not args.output:
+        parser.error("--bulk requires --output")
+    
     try:
         # Initialize search engine
-        engine = ScopusSearchEngine()
+        engine = ScopusSearchEngine(args.index)
         
-        # Start interactive search
-        engine.interactive_search()
+        if args.bulk:
+            from bulk_match import run_bulk_match
+            run_bulk_match(engine, args.bulk, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                           min_score=args.min_score, resume=args.resume)
+        else:
+            # Start interactive search
+            engine.interactive_search()
         
     except FileNotFoundError as e:
         print(f"❌ {e}")
@@ -0,0 +1,297 @@
+"""
+Sharded search for catalogs larger than one matrix comfortably handles.
+
+The index is partitioned by row range into shards, each a complete
+ScopusSearchEngine over its rows. Global statistics (TF-IDF vectorizer,
+BM25F idf and length ratios, static priors) are shared, so per-shard scores
+are identical to unsharded scores. A query is scored on every shard in
+parallel and the per-shard top-k lists are merged with a heap.
+
+Shards can live in the current process (scored in a thread pool; the sparse
+products release the GIL) or in separate local processes reached over a
+small RPC layer built on multiprocessing.connection:
+
+    # In-process shards
+    engine = ShardedSearchEngine.from_engine(ScopusSearchEngine(), n_shards=4)
+
+    # One process per shard, talking over localhost RPC
+    engine = ShardedSearchEngine.spawn('scopus_search_index.pkl', n_shards=4)
+
+    results = engine.search("machine learning", top_k=20)
+    engine.close()
+
+Shards started separately with `python sharded_search.py --start 0 --stop 25000
+--port 6100 --authkey ...` can be joined with ShardedSearchEngine.connect().
+"""
+
+import heapq
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from index_manifest import load_index, read_manifest
+from journal_metadata import slice_columns
+from search_scopus import ScopusSearchEngine
+
+DEFAULT_BASE_PORT = 6100
+
+
+def slice_index_data(index_data, start, stop):
+    """
+    Return the index data of rows start:stop.
+
+    Global structures (vectorizers, idf) are shared; per-row structures are
+    sliced. Structures that are cheap to rebuild per shard (subject index)
+    or only needed by the coordinator (neighbour table) are left out.
+    """
+    shard = {
+        'tfidf_matrix': index_data['tfidf_matrix'][start:stop],
+        'vectorizer': index_data['vectorizer'],
+        'texts': index_data['texts'][start:stop],
+        'metadatas': index_data['metadatas'][start:stop],
+        'dataset_info': dict(index_data['dataset_info'], total_documents=stop - start, shard=(start, stop)),
+    }
+    if 'columns' in index_data:
+        shard['columns'] = slice_columns(index_data['columns'], start, stop)
+    if 'bm25f' in index_data:
+        bm25f = index_data['bm25f']
+        shard['bm25f'] = {
+            'vectorizer': bm25f['vectorizer'],
+            'idf': bm25f['idf'],
+            'fields': {
+                field: {'tf': data['tf'][start:stop], 'length_ratio': data['length_ratio'][start:stop]}
+                for field, data in bm25f['fields'].items()
+            },
+        }
+    return shard
+
+
+def shard_bounds(n_rows, n_shards):
+    """Split n_rows into n_shards contiguous (start, stop) ranges."""
+    n_shards = max(1, min(n_shards, n_rows or 1))
+    step = -(-n_rows // n_shards)
+    return [(start, min(start + step, n_rows)) for start in range(0, n_rows, step)] or [(0, 0)]
+
+
+class LocalShard:
+    """A shard held in the current process."""
+
+    def __init__(self, index_data, start, stop, scoring='auto', prior_weight=0.1):
+        self.start = start
+        self.stop = stop
+        self.engine = ScopusSearchEngine(index_data=slice_index_data(index_data, start, stop), scoring=scoring,
+                                         prior_weight=prior_weight)
+
+    def search(self, query, top_k=10, min_score=0.1, **filters):
+        """Return this shard's top results as (score, global row, result) tuples."""
+        results = self.engine.search(query, top_k=top_k, min_score=min_score, **filters)
+        return [
+            (float(result['score']), self.start + self.engine.row_by_id[result['sourcerecord_id']], result)
+            for result in results
+        ]
+
+    def close(self):
+        pass
+
+
+class RemoteShard:
+    """Client for a shard served by serve_shard() in another process."""
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per calling thread, so shards can be queried concurrently
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = Client(self.address, authkey=self.authkey)
+        return self._local.conn
+
+    def call(self, method, **kwargs):
+        """Send one RPC request and return its result."""
+        conn = self._connection()
+        conn.send((method, kwargs))
+        status, value = conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Shard {self.address} failed: {value}")
+        return value
+
+    def search(self, query, top_k=10, min_score=0.1, **filters):
+        """Return the remote shard's top results as (score, global row, result) tuples."""
+        return self.call('search', query=query, top_k=top_k, min_score=min_score, **filters)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _handle_connection(conn, shard, stopping, address, authkey):
+    """Serve RPC requests from one client connection."""
+    with conn:
+        while True:
+            try:
+                method, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                if method == 'search':
+                    conn.send(('ok', shard.search(**kwargs)))
+                elif method == 'info':
+                    conn.send(('ok', {'start': shard.start, 'stop': shard.stop, 'pid': os.getpid()}))
+                elif method == 'shutdown':
+                    conn.send(('ok', None))
+                    stopping.set()
+                    Client(address, authkey=authkey).close()  # wake up accept()
+                    return
+                else:
+                    conn.send(('error', f"Unknown method '{method}'"))
+            except Exception as e:
+                conn.send(('error', str(e)))
+
+
+def serve_shard(index_file, start, stop, address, authkey, scoring='auto', ready=None, prior_weight=0.1):
+    """
+    Load rows start:stop of an index and serve them over RPC until shut down.
+
+    Args:
+        index_file (str): Path to the pickled index
+        start (int): First row of the shard
+        stop (int): Row after the last row of the shard
+        address (tuple): (host, port) to listen on
+        authkey (bytes): Shared secret clients must present
+        scoring (str): Scoring method passed to ScopusSearchEngine
+        ready (multiprocessing.Event): Set once the shard is accepting connections
+        prior_weight (float): Static prior boost passed to ScopusSearchEngine
+    """
+    index_data, _ = load_index(index_file)
+    shard = LocalShard(index_data, start, stop, scoring=scoring, prior_weight=prior_weight)
+    del index_data
+
+    stopping = threading.Event()
+    with Listener(address, authkey=authkey) as listener:
+        if ready is not None:
+            ready.set()
+        while not stopping.is_set():
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A failed handshake only affects that client; keep serving
+                continue
+            if stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=_handle_connection, args=(conn, shard, stopping, address, authkey),
+                             daemon=True).start()
+
+
+class ShardedSearchEngine:
+    """Scores a query on every shard in parallel and merges the top-k lists."""
+
+    def __init__(self, shards, processes=()):
+        self.shards = shards
+        self.processes = list(processes)
+        self.pool = ThreadPoolExecutor(max_workers=len(shards))
+
+    @classmethod
+    def from_engine(cls, engine, n_shards, scoring=None):
+        """Shard an already-loaded engine into in-process shards."""
+        scoring = scoring or engine.scoring
+        bounds = shard_bounds(len(engine.metadatas), n_shards)
+        return cls([LocalShard(engine.index_data, start, stop, scoring=scoring, prior_weight=engine.prior_weight)
+                    for start, stop in bounds])
+
+    @classmethod
+    def spawn(cls, index_file, n_shards, host='127.0.0.1', base_port=DEFAULT_BASE_PORT, scoring='auto',
+              prior_weight=0.1):
+        """Start one local shard-server process per row range and connect to them."""
+        manifest = read_manifest(index_file)
+        if manifest and 'total_documents' in manifest.get('dataset_info', {}):
+            n_rows = manifest['dataset_info']['total_documents']
+        else:
+            n_rows = len(load_index(index_file)[0]['metadatas'])
+
+        authkey = os.urandom(16)
+        context = multiprocessing.get_context('spawn')
+        shards, processes = [], []
+        for i, (start, stop) in enumerate(shard_bounds(n_rows, n_shards)):
+            address = (host, base_port + i)
+            ready = context.Event()
+            process = context.Process(target=serve_shard,
+                                      args=(index_file, start, stop, address, authkey, scoring, ready, prior_weight),
+                                      daemon=True)
+            process.start()
+            processes.append((process, ready))
+            shards.append(RemoteShard(address, authkey))
+
+        for process, ready in processes:
+            while not ready.wait(1):
+                if not process.is_alive():
+                    raise RuntimeError(f"Shard process {process.pid} exited during startup")
+        return cls(shards, [process for process, _ in processes])
+
+    @classmethod
+    def connect(cls, addresses, authkey):
+        """Connect to shard servers that are already running."""
+        return cls([RemoteShard(tuple(address), authkey) for address in addresses])
+
+    def search(self, query, top_k=10, min_score=0.1, **filters):
+        """
+        Search every shard and return the merged top_k results.
+
+        Takes the same arguments as ScopusSearchEngine.search.
+        """
+        futures = [self.pool.submit(shard.search, query, top_k, min_score, **filters) for shard in self.shards]
+        hits = [hit for future in futures for hit in future.result()]
+        best = heapq.nsmallest(top_k, hits, key=lambda hit: (-hit[0], hit[1]))
+        results = []
+        for rank, (_, _, result) in enumerate(best, 1):
+            result['rank'] = rank
+            results.append(result)
+        return results
+
+    def close(self):
+        """Stop spawned shard processes and release connections."""
+        for shard in self.shards:
+            if isinstance(shard, RemoteShard) and self.processes:
+                try:
+                    shard.call('shutdown')
+                except (OSError, EOFError, RuntimeError):
+                    pass
+            shard.close()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.pool.shutdown(wait=False)
+
+
+def main():
+    """Serve one shard from the command line (pair with ShardedSearchEngine.connect)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a row range of the Scopus index over RPC.")
+    parser.add_argument('--index', default='scopus_search_index.pkl')
+    parser.add_argument('--start', type=int, required=True, help="First row of the shard")
+    parser.add_argument('--stop', type=int, required=True, help="Row after the last row of the shard")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_BASE_PORT)
+    parser.add_argument('--prior-weight', type=float, default=0.1, help="Static prior boost (match the coordinator)")
+    parser.add_argument('--authkey', default=os.getenv('SCOPUS_SHARD_AUTHKEY', ''),
+                        help="Shared secret (default: $SCOPUS_SHARD_AUTHKEY)")
+    args = parser.parse_args()
+
+    if not args.authkey:
+        parser.error("an authkey is required (--authkey or SCOPUS_SHARD_AUTHKEY)")
+    print(f"🧩 Serving rows {args.start:,}-{args.stop:,} of {args.index} on {args.host}:{args.port}")
+    serve_shard(args.index, args.start, args.stop, (args.host, args.port), args.authkey.encode(),
+                prior_weight=args.prior_weight)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Precomputed "more like this" neighbour table.
+
+For every journal the k most similar journals by TF-IDF cosine similarity are
+computed once at build time. Rows are processed in blocks: each block is one
+sparse product against the whole (L2-normalised) matrix, and blocks are spread
+over a process pool. The result is stored as compact int32 row ids and
+float16 similarities.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Shared with worker processes through the pool initializer
+_matrix = None
+_matrix_t = None
+
+
+def _init_worker(matrix):
+    """Keep the matrix (and its transpose) in the worker for every block."""
+    global _matrix, _matrix_t
+    _matrix = matrix
+    _matrix_t = matrix.T.tocsr()
+
+
+def _block_neighbors(bounds, k):
+    """Return (start, neighbour ids, similarities) for rows start:stop."""
+    start, stop = bounds
+    similarities = (_matrix[start:stop] @ _matrix_t).toarray()
+    similarities[np.arange(stop - start), np.arange(start, stop)] = -1.0  # skip self
+
+    top_k = min(k, similarities.shape[1] - 1)
+    top = np.argpartition(similarities, -top_k, axis=1)[:, -top_k:]
+    top_scores = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return (
+        start,
+        np.take_along_axis(top, order, axis=1).astype(np.int32),
+        np.take_along_axis(top_scores, order, axis=1).astype(np.float16),
+    )
+
+
+def build_neighbor_table(tfidf_matrix, k=20, block_size=256, workers=None):
+    """
+    Compute the k nearest neighbours of every row.
+
+    Args:
+        tfidf_matrix: L2-normalised sparse matrix (rows are journals)
+        k (int): Neighbours kept per journal
+        block_size (int): Rows per sparse product; bounds the dense block memory
+        workers (int): Worker processes (defaults to the CPU count)
+
+    Returns:
+        dict: 'neighbors' (int32, n x k) and 'scores' (float16, n x k)
+    """
+    n_rows = tfidf_matrix.shape[0]
+    k = min(k, max(n_rows - 1, 0))
+    neighbors = np.zeros((n_rows, k), dtype=np.int32)
+    scores = np.zeros((n_rows, k), dtype=np.float16)
+    if k == 0:
+        return {'neighbors': neighbors, 'scores': scores}
+
+    matrix = tfidf_matrix.tocsr().astype(np.float32)
+    blocks = [(start, min(start + block_size, n_rows)) for start in range(0, n_rows, block_size)]
+    workers = workers or os.cpu_count() or 1
+
+    # Build scripts run at module level, so workers must be forked rather than
+    # spawned (spawning would re-run the script); without fork, run in-process.
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                                   initializer=_init_worker, initargs=(matrix,))
+        with pool:
+            block_results = list(pool.map(_block_neighbors, blocks, [k] * len(blocks)))
+    else:
+        _init_worker(matrix)
+        block_results = [_block_neighbors(bounds, k) for bounds in blocks]
+
+    for start, block_neighbors, block_scores in block_results:
+        neighbors[start:start + len(block_neighbors)] = block_neighbors
+        scores[start:start + len(block_scores)] = block_scores
+
+    return {'neighbors': neighbors, 'scores': scores}
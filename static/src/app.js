@@ -0,0 +1,487 @@
+class ScopusSearch {
+    constructor() {
+        this.searchInput = document.getElementById('searchInput');
+        this.searchBtn = document.getElementById('searchBtn');
+        this.resultsContainer = document.getElementById('resultsContainer');
+        this.resultsList = document.getElementById('resultsList');
+        this.resultsTitle = document.getElementById('resultsTitle');
+        this.resultsMeta = document.getElementById('resultsMeta');
+        this.suggestionTags = document.getElementById('suggestionTags');
+        this.advancedFilters = {};
+
+        this.initializeEventListeners();
+        this.loadStats();
+        this.loadSuggestions();
+        this.initializeAccessibility();
+    }
+
+    initializeEventListeners() {
+        this.searchBtn.addEventListener('click', () => this.performSearch());
+        this.searchInput.addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') this.performSearch();
+        });
+
+        // Add input validation
+        this.searchInput.addEventListener('input', (e) => {
+            this.validateInput(e.target.value);
+        });
+    }
+
+    initializeAccessibility() {
+        // Add ARIA live regions for dynamic content
+        const liveRegion = document.createElement('div');
+        liveRegion.id = 'live-region';
+        liveRegion.setAttribute('aria-live', 'polite');
+        liveRegion.setAttribute('aria-atomic', 'true');
+        liveRegion.style.position = 'absolute';
+        liveRegion.style.left = '-10000px';
+        liveRegion.style.width = '1px';
+        liveRegion.style.height = '1px';
+        liveRegion.style.overflow = 'hidden';
+        document.body.appendChild(liveRegion);
+    }
+
+    validateInput(value) {
+        const isValid = value.trim().length > 0;
+        this.searchBtn.disabled = !isValid;
+
+        if (value.trim().length > 2) {
+            this.searchBtn.disabled = false;
+        }
+    }
+
+    announceToScreenReader(message) {
+        const liveRegion = document.getElementById('live-region');
+        if (liveRegion) {
+            liveRegion.textContent = message;
+            setTimeout(() => {
+                liveRegion.textContent = '';
+            }, 1000);
+        }
+    }
+
+    async loadStats() {
+        try {
+            const response = await fetch('/stats');
+            const data = await response.json();
+
+            if (data.error) {
+                console.error('Stats error:', data.error);
+                return;
+            }
+
+            document.getElementById('totalJournals').textContent = data.total_journals.toLocaleString();
+            document.getElementById('totalFeatures').textContent = data.total_features.toLocaleString();
+            document.getElementById('indexSize').textContent = data.index_size_mb;
+
+            this.announceToScreenReader(`Loaded statistics: ${data.total_journals} journals available`);
+        } catch (error) {
+            console.error('Error loading stats:', error);
+            // Fallback values for demo
+            document.getElementById('totalJournals').textContent = '40,247';
+            document.getElementById('totalFeatures').textContent = '15';
+            document.getElementById('indexSize').textContent = '2.3';
+        }
+    }
+
+    async loadSuggestions() {
+        // Enhanced suggestions with more relevant academic topics
+        const suggestions = [
+            'artificial intelligence',
+            'machine learning',
+            'computer science',
+            'medical research',
+            'bioengineering',
+            'renewable energy',
+            'data science',
+            'psychology',
+            'neuroscience',
+            'materials science',
+            'environmental science',
+            'biotechnology'
+        ];
+
+        try {
+            // Try to load from API first
+            const response = await fetch('/suggestions');
+            const data = await response.json();
+            const apiSuggestions = data.suggestions || suggestions;
+
+            apiSuggestions.forEach(suggestion => {
+                const tag = document.createElement('button');
+                tag.className = 'suggestion-tag';
+                tag.textContent = suggestion;
+                tag.setAttribute('role', 'listitem');
+                tag.addEventListener('click', () => {
+                    this.searchInput.value = suggestion;
+                    this.performSearch();
+                    this.announceToScreenReader(`Selected suggestion: ${suggestion}`);
+                });
+                this.suggestionTags.appendChild(tag);
+            });
+        } catch (error) {
+            console.error('Error loading suggestions:', error);
+            // Use fallback suggestions
+            suggestions.forEach(suggestion => {
+                const tag = document.createElement('button');
+                tag.className = 'suggestion-tag';
+                tag.textContent = suggestion;
+                tag.setAttribute('role', 'listitem');
+                tag.addEventListener('click', () => {
+                    this.searchInput.value = suggestion;
+                    this.performSearch();
+                });
+                this.suggestionTags.appendChild(tag);
+            });
+        }
+    }
+
+    async performSearch() {
+        const query = this.searchInput.value.trim();
+        if (!query) {
+            this.announceToScreenReader('Please enter a search query');
+            this.searchInput.focus();
+            return;
+        }
+
+        const maxResults = document.getElementById('maxResults').value;
+        const minScore = document.getElementById('minScore').value;
+
+        this.showLoading();
+        this.searchBtn.disabled = true;
+        this.announceToScreenReader(`Searching for: ${query}`);
+
+        // Track search for analytics (placeholder)
+        this.trackSearch(query);
+
+        try {
+            const response = await fetch('/search', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    query: query,
+                    top_k: parseInt(maxResults),
+                    min_score: parseFloat(minScore),
+                    filters: this.advancedFilters
+                })
+            });
+
+            const data = await response.json();
+
+            if (data.error) {
+                this.showError(data.error);
+                this.announceToScreenReader(`Search error: ${data.error}`);
+                return;
+            }
+
+            this.displayResults(data);
+            this.announceToScreenReader(`Found ${data.total_results} results for ${query}`);
+
+        } catch (error) {
+            this.showError('Network error: ' + error.message);
+            this.announceToScreenReader('Network error occurred');
+        } finally {
+            this.searchBtn.disabled = false;
+        }
+    }
+
+    trackSearch(query) {
+        // Placeholder for analytics tracking
+        if (typeof gtag !== 'undefined') {
+            gtag('event', 'search', {
+                'search_term': query,
+                'event_category': 'Journal Search',
+            });
+        }
+    }
+
+    showLoading() {
+        this.resultsContainer.style.display = 'block';
+        this.resultsTitle.textContent = 'Searching...';
+        this.resultsMeta.textContent = '';
+        this.resultsList.innerHTML = `
+            <div class="loading">
+                <div class="spinner" role="status" aria-label="Loading"></div>
+                <div>Searching through ${document.getElementById('totalJournals').textContent} journals...</div>
+            </div>
+        `;
+    }
+
+    showError(error) {
+        this.resultsContainer.style.display = 'block';
+        this.resultsTitle.textContent = 'Error';
+        this.resultsMeta.textContent = '';
+        this.resultsList.innerHTML = `
+            <div class="error" role="alert">
+                <i class="fas fa-exclamation-triangle"></i> ${error}
+            </div>
+        `;
+    }
+
+    displayResults(data) {
+        this.resultsContainer.style.display = 'block';
+        this.resultsTitle.textContent = `Search Results for "${data.query}"`;
+        this.resultsMeta.textContent = `Found ${data.total_results} relevant journals`;
+
+        if (data.results.length === 0) {
+            this.resultsList.innerHTML = `
+                <div class="no-results">
+                    <i class="fas fa-search"></i>
+                    <h3>No results found</h3>
+                    <p>Try different keywords, ISSN numbers, or reduce the minimum score threshold</p>
+                    <div style="margin-top: 20px;">
+                        <strong>Suggestions:</strong>
+                        <ul style="text-align: left; display: inline-block; margin-top: 10px;">
+                            <li>Use broader terms (e.g., "AI" instead of "artificial neural networks")</li>
+                            <li>Check spelling of technical terms</li>
+                            <li>Try searching by ISSN if you know it</li>
+                            <li>Use the advanced filters to narrow down by publisher or subject</li>
+                        </ul>
+                    </div>
+                </div>
+            `;
+            return;
+        }
+
+        this.resultsList.innerHTML = data.results.map((result, index) => `
+            <article class="result-item" onclick="toggleResult(${index})" 
+                     role="button" tabindex="0" 
+                     onkeydown="handleResultKeydown(event, ${index})"
+                     aria-expanded="false">
+                <div class="result-header">
+                    <div>
+                        <h3 class="result-title">
+                            ${this.highlightText(result.title, data.query)}
+                            ${result.active_status ? `
+                                <span class="status-badge ${result.active_status.toLowerCase() === 'active' ? 'status-active' : 'status-inactive'}"
+                                      aria-label="Journal status: ${result.active_status}">
+                                    ${result.active_status}
+                                </span>
+                            ` : ''}
+                        </h3>
+                    </div>
+                    <i class="fas fa-chevron-down expand-icon" aria-hidden="true"></i>
+                </div>
+                <div class="result-meta">
+                    <div class="meta-item">
+                        <i class="fas fa-building meta-icon" aria-hidden="true"></i>
+                        <span>${result.publisher || 'Unknown Publisher'}</span>
+                    </div>
+                    <div class="meta-item">
+                        <i class="fas fa-bookmark meta-icon" aria-hidden="true"></i>
+                        <span>${result.type || 'Unknown Type'}</span>
+                    </div>
+                    ${result.issn ? `
+                    <div class="meta-item">
+                        <i class="fas fa-barcode meta-icon" aria-hidden="true"></i>
+                        <span>ISSN: ${result.issn}</span>
+                    </div>
+                    ` : ''}
+                    ${result.eissn ? `
+                    <div class="meta-item">
+                        <i class="fas fa-barcode meta-icon" aria-hidden="true"></i>
+                        <span>eISSN: ${result.eissn}</span>
+                    </div>
+                    ` : ''}
+                    ${result.coverage ? `
+                    <div class="meta-item">
+                        <i class="fas fa-calendar meta-icon" aria-hidden="true"></i>
+                        <span>Coverage: ${result.coverage}</span>
+                    </div>
+                    ` : ''}
+                    ${result.open_access ? `
+                    <div class="meta-item">
+                        <i class="fas fa-unlock meta-icon" aria-hidden="true"></i>
+                        <span>Open Access: ${result.open_access}</span>
+                    </div>
+                    ` : ''}
+                </div>
+                <div class="result-description" id="description-${index}" aria-hidden="true">
+                    <h4><i class="fas fa-robot"></i> AI-Generated Description</h4>
+                    <p>${this.highlightText(result.description, data.query)}</p>
+                    ${result.scopus_url ? `
+                        <div style="margin-top: 15px; padding-top: 15px; border-top: 1px solid rgba(14, 165, 233, 0.2);">
+                            <a href="${result.scopus_url}" target="_blank" rel="noopener noreferrer" 
+                               style="color: #0ea5e9; text-decoration: none; font-weight: 500; display: inline-flex; align-items: center; gap: 6px;">
+                                <i class="fas fa-external-link-alt"></i> View on Scopus
+                            </a>
+                        </div>
+                    ` : ''}
+                </div>
+            </article>
+        `).join('');
+
+        // Auto-scroll to results
+        setTimeout(() => {
+            this.resultsContainer.scrollIntoView({ 
+                behavior: 'smooth', 
+                block: 'start' 
+            });
+        }, 100);
+    }
+
+    highlightText(text, query) {
+        if (!query || !text) return text;
+
+        const words = query.split(' ').filter(word => word.length > 2);
+        let highlightedText = text;
+
+        words.forEach(word => {
+            const regex = new RegExp(`(${word})`, 'gi');
+            highlightedText = highlightedText.replace(regex, '<mark style="background: #fef3c7; color: #92400e; padding: 1px 2px; border-radius: 2px;">$1</mark>');
+        });
+
+        return highlightedText;
+    }
+}
+
+// Global functions for modal and result interactions
+function openAdvancedSearch() {
+    const modal = document.getElementById('advancedSearchModal');
+    modal.style.display = 'flex';
+    modal.setAttribute('aria-hidden', 'false');
+    document.getElementById('publisherFilter').focus();
+}
+
+function closeAdvancedSearch() {
+    const modal = document.getElementById('advancedSearchModal');
+    modal.style.display = 'none';
+    modal.setAttribute('aria-hidden', 'true');
+}
+
+function clearAdvancedFilters() {
+    document.getElementById('publisherFilter').value = '';
+    document.getElementById('typeFilter').value = '';
+    document.getElementById('openAccessFilter').value = '';
+    document.getElementById('subjectFilter').value = '';
+    document.getElementById('languageFilter').value = '';
+    document.getElementById('statusFilter').value = '';
+
+    if (window.scopusSearch) {
+        window.scopusSearch.advancedFilters = {};
+    }
+
+    // Reset button appearance
+    const advancedBtn = document.querySelector('.advanced-btn');
+    advancedBtn.innerHTML = '<i class="fas fa-filter" aria-hidden="true"></i> Advanced Filters';
+    advancedBtn.style.background = 'linear-gradient(135deg, #4f46e5 0%, #7c3aed 100%)';
+}
+
+function applyAdvancedSearch() {
+    const filters = {};
+
+    const publisher = document.getElementById('publisherFilter').value.trim();
+    const type = document.getElementById('typeFilter').value;
+    const openAccess = document.getElementById('openAccessFilter').value;
+    const subjects = document.getElementById('subjectFilter').value.trim();
+    const language = document.getElementById('languageFilter').value;
+    const status = document.getElementById('statusFilter').value;
+
+    if (publisher) filters.publisher = publisher;
+    if (type) filters.type = type;
+    if (openAccess) filters.open_access = openAccess;
+    if (subjects) filters.subject_areas = subjects;
+    if (language) filters.language = language;
+    if (status) filters.status = status;
+
+    if (window.scopusSearch) {
+        window.scopusSearch.advancedFilters = filters;
+    }
+
+    closeAdvancedSearch();
+
+    // Show applied filters indicator
+    const filterCount = Object.keys(filters).length;
+    const advancedBtn = document.querySelector('.advanced-btn');
+    if (filterCount > 0) {
+        advancedBtn.innerHTML = `<i class="fas fa-filter" aria-hidden="true"></i> Filters Applied (${filterCount})`;
+        advancedBtn.style.background = 'linear-gradient(135deg, #059669 0%, #047857 100%)';
+    } else {
+        advancedBtn.innerHTML = '<i class="fas fa-filter" aria-hidden="true"></i> Advanced Filters';
+        advancedBtn.style.background = 'linear-gradient(135deg, #4f46e5 0%, #7c3aed 100%)';
+    }
+
+    // Trigger search if there's a query
+    const query = document.getElementById('searchInput').value.trim();
+    if (query && window.scopusSearch) {
+        window.scopusSearch.performSearch();
+    }
+}
+
+function toggleResult(index) {
+    const resultItem = document.querySelectorAll('.result-item')[index];
+    const description = document.getElementById(`description-${index}`);
+
+    if (resultItem && description) {
+        const isExpanded = resultItem.classList.contains('expanded');
+
+        // Close all other expanded results
+        document.querySelectorAll('.result-item.expanded').forEach(item => {
+            item.classList.remove('expanded');
+            item.setAttribute('aria-expanded', 'false');
+        });
+        document.querySelectorAll('.result-description.show').forEach(desc => {
+            desc.classList.remove('show');
+            desc.setAttribute('aria-hidden', 'true');
+        });
+
+        if (!isExpanded) {
+            resultItem.classList.add('expanded');
+            resultItem.setAttribute('aria-expanded', 'true');
+            description.classList.add('show');
+            description.setAttribute('aria-hidden', 'false');
+
+            // Scroll the expanded result into view
+            setTimeout(() => {
+                resultItem.scrollIntoView({ 
+                    behavior: 'smooth', 
+                    block: 'center' 
+                });
+            }, 150);
+        }
+    }
+}
+
+function handleResultKeydown(event, index) {
+    if (event.key === 'Enter' || event.key === ' ') {
+        event.preventDefault();
+        toggleResult(index);
+    }
+}
+
+// Initialize the search interface when the page loads
+document.addEventListener('DOMContentLoaded', () => {
+    window.scopusSearch = new ScopusSearch();
+});
+
+// Close modal when clicking outside or pressing Escape
+document.addEventListener('click', (e) => {
+    const modal = document.getElementById('advancedSearchModal');
+    if (e.target === modal) {
+        closeAdvancedSearch();
+    }
+});
+
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape') {
+        const modal = document.getElementById('advancedSearchModal');
+        if (modal.style.display === 'flex') {
+            closeAdvancedSearch();
+        }
+    }
+});
+
+// Service Worker for offline functionality (optional)
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js')
+            .then(registration => {
+                console.log('SW registered: ', registration);
+            })
+            .catch(registrationError => {
+                console.log('SW registration failed: ', registrationError);
+            });
+    });
+}
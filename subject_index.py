@@ -0,0 +1,131 @@
+"""
+ASJC subject inverted index.
+
+Maps every 4-digit ASJC code (e.g. 1702) and every 2-digit major subject area
+(e.g. 17, covering 1700-1799) to a sorted int32 posting list. Postings hold
+prior ranks rather than row ids: ascending order is therefore both the order
+needed for sorted-array intersection and the static-prior ranking used for
+browsing. Map a rank back to its row with prior_order[rank].
+"""
+
+import numpy as np
+
+from journal_metadata import clean_value
+
+
+def parse_asjc_codes(value):
+    """Parse a ';'-joined ASJC string into a list of int codes."""
+    codes = []
+    for part in clean_value(value).split(';'):
+        part = part.strip()
+        if part.isdigit():
+            codes.append(int(part))
+    return codes
+
+
+def parse_subject_query(value):
+    """
+    Parse user input such as '1702, 1712' or '17+27' into int codes.
+
+    Returns:
+        list: 4-digit codes and/or 2-digit major areas
+
+    Raises:
+        ValueError: If a code is not a 2- or 4-digit number
+    """
+    codes = []
+    for part in str(value).replace('+', ',').replace(';', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or len(part) not in (2, 4):
+            raise ValueError(f"Invalid ASJC code '{part}' (expected 2 or 4 digits)")
+        codes.append(int(part))
+    return codes
+
+
+def build_subject_index(metadatas, prior_order):
+    """
+    Build the subject posting lists in CSR layout.
+
+    Args:
+        metadatas (list): Journal metadata dicts with 'asjc_codes'
+        prior_order (numpy.ndarray): Row ids sorted by descending prior
+
+    Returns:
+        dict: 'codes' (sorted int32), 'offsets' (int64) and 'postings' (int32)
+    """
+    prior_rank = np.empty(len(prior_order), dtype=np.int32)
+    prior_rank[prior_order] = np.arange(len(prior_order), dtype=np.int32)
+
+    pair_codes = []
+    pair_ranks = []
+    for idx, metadata in enumerate(metadatas):
+        codes = set(parse_asjc_codes(metadata.get('asjc_codes')))
+        codes.update(code // 100 for code in list(codes) if code >= 1000)
+        pair_codes.extend(codes)
+        pair_ranks.extend([prior_rank[idx]] * len(codes))
+
+    pair_codes = np.array(pair_codes, dtype=np.int32)
+    pair_ranks = np.array(pair_ranks, dtype=np.int32)
+    order = np.lexsort((pair_ranks, pair_codes))
+    pair_codes = pair_codes[order]
+
+    codes, starts = np.unique(pair_codes, return_index=True)
+    offsets = np.append(starts, len(pair_codes)).astype(np.int64)
+    return {
+        'codes': codes.astype(np.int32),
+        'offsets': offsets,
+        'postings': pair_ranks[order],
+    }
+
+
+def intersect_sorted(small, large):
+    """Intersect two sorted unique arrays by binary-searching the smaller one."""
+    if not len(large):
+        return large
+    pos = np.searchsorted(large, small)
+    pos[pos == len(large)] = len(large) - 1
+    return small[large[pos] == small]
+
+
+class SubjectIndex:
+    """Query interface over the arrays produced by build_subject_index()."""
+
+    def __init__(self, index):
+        self.codes = index['codes']
+        self.offsets = index['offsets']
+        self.postings = index['postings']
+
+    def postings_for(self, code):
+        """Return the sorted prior ranks of journals in one subject code."""
+        pos = np.searchsorted(self.codes, code)
+        if pos >= len(self.codes) or self.codes[pos] != code:
+            return self.postings[:0]
+        return self.postings[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def lookup(self, codes, mode='or'):
+        """
+        Combine the posting lists of several codes.
+
+        Args:
+            codes (list): ASJC codes or 2-digit major areas
+            mode (str): 'or' for any subject, 'and' for all subjects
+
+        Returns:
+            numpy.ndarray: Sorted prior ranks of matching journals
+        """
+        lists = [self.postings_for(code) for code in codes]
+        if not lists:
+            return self.postings[:0]
+        if len(lists) == 1:
+            return lists[0]
+        if mode == 'and':
+            lists.sort(key=len)
+            result = lists[0]
+            for other in lists[1:]:
+                if not len(result):
+                    break
+                result = intersect_sorted(result, other)
+            return result
+        return np.unique(np.concatenate(lists))